@@ -0,0 +1,24 @@
+import numpy as np
+import xarray as xr
+
+# Sizes of the synthetic datasets: number of frames and grid points in lon/lat.
+# Add entries here to benchmark other sizes.
+SIZES = {
+    "small": dict(n_frames=8, nlon=180, nlat=90),
+    "large": dict(n_frames=24, nlon=1440, nlat=720),
+}
+
+
+def synthetic_dataarray(n_frames=8, nlon=180, nlat=90, chunks=None):
+    """Global field with a travelling wave, `n_frames` steps along `time`"""
+    lon = np.linspace(-179.5, 179.5, nlon)
+    lat = np.linspace(-89.5, 89.5, nlat)
+    time = np.arange(n_frames)
+    rng = np.random.default_rng(0)
+    data = np.sin(np.deg2rad(lon)[None, None, :] * 3 - time[:, None, None] / 4) * np.cos(
+        np.deg2rad(lat)
+    )[None, :, None] + rng.normal(scale=0.1, size=(n_frames, nlat, nlon))
+    da = xr.DataArray(data, coords=[("time", time), ("lat", lat), ("lon", lon)], name="wave")
+    if chunks is not None:
+        da = da.chunk({"time": chunks})
+    return da
@@ -0,0 +1,26 @@
+import sys
+
+# startup is paid again by every (short-lived) worker process, so the slow
+# optional parts are only imported once they are used
+DEFERRED_MODULES = ["cartopy", "shapely", "dask"]
+
+
+class Import:
+    """Importing xmovie in a fresh interpreter"""
+
+    def timeraw_import_xmovie(self):
+        return "import xmovie"
+
+    def timeraw_import_dependencies(self):
+        # the part of the startup we can not avoid
+        return "import matplotlib.pyplot, xarray"
+
+    def track_deferred_modules(self):
+        # run in a fresh interpreter, so nothing has been imported before
+        import subprocess
+
+        code = "import sys, xmovie; print(*sys.modules)"
+        modules = subprocess.check_output([sys.executable, "-c", code], text=True).split()
+        return len([m for m in modules if m.split(".")[0] in DEFERRED_MODULES])
+
+    track_deferred_modules.unit = "modules"
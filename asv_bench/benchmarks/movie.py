@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import time
+
+import matplotlib.pyplot as plt
+
+from xmovie import Movie
+from xmovie.core import combine_frames_into_movie, convert_gif
+from xmovie.presets import rotating_globe
+
+from . import SIZES, synthetic_dataarray
+
+# keep the frames small, we are not benchmarking the PNG size
+MOVIE_KWARGS = dict(pixelwidth=640, pixelheight=360, dpi=100)
+# Natural Earth features are downloaded on first use, which we do not want to measure
+GLOBE_KWARGS = dict(plotfunc=rotating_globe, coastline=False)
+
+
+class MovieInit:
+    """Creating a Movie, including the computation of the color limits"""
+
+    params = (list(SIZES), [False, True], [False, True])
+    param_names = ["size", "lazy", "limits_given"]
+
+    def setup(self, size, lazy, limits_given):
+        chunks = 1 if lazy else None
+        self.da = synthetic_dataarray(**SIZES[size], chunks=chunks)
+        self.kwargs = dict(vmin=-1, vmax=1) if limits_given else dict()
+
+    def time_init(self, size, lazy, limits_given):
+        Movie(self.da, **MOVIE_KWARGS, **self.kwargs)
+
+    def peakmem_init(self, size, lazy, limits_given):
+        Movie(self.da, **MOVIE_KWARGS, **self.kwargs)
+
+
+class RenderFrame:
+    """Rendering a single frame with the presets"""
+
+    params = (list(SIZES), ["basic", "rotating_globe"])
+    param_names = ["size", "preset"]
+
+    def setup(self, size, preset):
+        kwargs = GLOBE_KWARGS if preset == "rotating_globe" else dict()
+        self.mov = Movie(synthetic_dataarray(**SIZES[size]), vmin=-1, vmax=1, **MOVIE_KWARGS, **kwargs)
+
+    def time_render_single_frame(self, size, preset):
+        fig, ax, pp = self.mov.render_single_frame(1)
+        plt.close(fig)
+
+
+class SaveFrames:
+    """Saving all frames to files, serially and in parallel"""
+
+    params = (list(SIZES), ["basic", "rotating_globe"], ["serial", "dask", "processes"])
+    param_names = ["size", "preset", "executor"]
+    # every sample renders the complete movie
+    number = 1
+    repeat = (1, 3, 60.0)
+
+    def setup(self, size, preset, executor):
+        kwargs = GLOBE_KWARGS if preset == "rotating_globe" else dict()
+        # one chunk per two frames, so that the dask tasks render several frames each
+        chunks = 2 if executor == "dask" else None
+        da = synthetic_dataarray(**SIZES[size], chunks=chunks)
+        self.n_frames = len(da.time)
+        self.mov = Movie(da, vmin=-1, vmax=1, **MOVIE_KWARGS, **kwargs)
+        self.odir = tempfile.mkdtemp()
+
+    def teardown(self, size, preset, executor):
+        shutil.rmtree(self.odir)
+
+    def _save_frames(self, executor):
+        if executor == "dask":
+            self.mov.save_frames_parallel(self.odir)
+        elif executor == "processes":
+            self.mov.save_frames_processes(self.odir)
+        else:
+            self.mov.save_frames_serial(self.odir)
+
+    def time_save_frames(self, size, preset, executor):
+        self._save_frames(executor)
+
+    def peakmem_save_frames(self, size, preset, executor):
+        # only measures this process, i.e. not the workers with executor="processes"
+        self._save_frames(executor)
+
+    def track_fps(self, size, preset, executor):
+        start = time.perf_counter()
+        self._save_frames(executor)
+        return self.n_frames / (time.perf_counter() - start)
+
+    track_fps.unit = "frames/s"
+
+
+class Encode:
+    """Encoding saved frames with ffmpeg"""
+
+    params = [list(SIZES)]
+    param_names = ["size"]
+    number = 1
+
+    def setup_cache(self):
+        # frames are rendered once (into the asv cache directory) for all sizes
+        frame_dirs = {}
+        for size in SIZES:
+            frame_dirs[size] = os.path.abspath(size)
+            os.makedirs(frame_dirs[size])
+            mov = Movie(synthetic_dataarray(**SIZES[size]), vmin=-1, vmax=1, **MOVIE_KWARGS)
+            mov.save_frames_serial(frame_dirs[size])
+            combine_frames_into_movie(frame_dirs[size], "movie.mp4", remove_frames=False)
+        return frame_dirs
+
+    def setup(self, frame_dirs, size):
+        self.n_frames = SIZES[size]["n_frames"]
+
+    def time_combine_frames_into_movie(self, frame_dirs, size):
+        combine_frames_into_movie(frame_dirs[size], "benchmark.mp4", remove_frames=False)
+
+    def time_convert_gif(self, frame_dirs, size):
+        convert_gif(
+            os.path.join(frame_dirs[size], "movie.mp4"),
+            gpath=os.path.join(frame_dirs[size], "benchmark.gif"),
+            remove_movie=False,
+        )
+
+    def track_combine_fps(self, frame_dirs, size):
+        start = time.perf_counter()
+        combine_frames_into_movie(frame_dirs[size], "benchmark.mp4", remove_frames=False)
+        return self.n_frames / (time.perf_counter() - start)
+
+    track_combine_fps.unit = "frames/s"
@@ -0,0 +1,152 @@
+"""Rendering the frames of a movie on a dask.distributed cluster.
+
+The workers return the rendered frames to the client, which pipes them into
+ffmpeg, so the cluster does not need a filesystem shared with the client.
+"""
+import collections
+import io
+import threading
+import uuid
+
+import numpy as np
+from distributed import WorkerPlugin, as_completed, get_client, get_worker
+from PIL import Image
+
+from .core import _frame_buffer, _has_render_protocol
+
+
+def _png(picture, compress_level=None):
+    """Encode the RGBA `picture` as a PNG file"""
+    kwargs = dict() if compress_level is None else dict(compress_level=compress_level)
+    with io.BytesIO() as buffer:
+        Image.fromarray(picture).save(buffer, format="png", **kwargs)
+        return buffer.getvalue()
+
+
+class _WarmFrames:
+    """Frames of `movie` rendered one at a time with a long-lived figure.
+
+    The figure (and the state of plot functions with ``setup``/``update``) is kept
+    between calls, so it is only set up once.
+    """
+
+    def __init__(self, movie):
+        self._timesteps = collections.deque()
+        self._frames = movie._iter_frames(self._feed())
+
+    def _feed(self):
+        while True:
+            yield self._timesteps.popleft()
+
+    def render(self, timestep):
+        self._timesteps.append(timestep)
+        return next(self._frames)[1]
+
+    def close(self):
+        self._frames.close()
+
+
+class MovieWorkerPlugin(WorkerPlugin):
+    """Keeps the movie on every worker, with a warm figure per worker thread"""
+
+    def __init__(self, movie, name):
+        self.movie = movie
+        self.name = name
+
+    def setup(self, worker):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._warm = []
+
+    def teardown(self, worker):
+        with self._lock:
+            for warm in self._warm:
+                warm.close()
+            self._warm.clear()
+
+    def _warm_frames(self):
+        warm = getattr(self._local, "frames", None)
+        if warm is None:
+            warm = self._local.frames = _WarmFrames(self.movie)
+            with self._lock:
+                self._warm.append(warm)
+        return warm
+
+    def _frames(self, timesteps):
+        if _has_render_protocol(self.movie.plotfunc):
+            # `render` may render frames in batches ahead of the requested one
+            yield from self.movie._iter_frames(timesteps)
+            return
+        warm = self._warm_frames()
+        for timestep in timesteps:
+            try:
+                frame = warm.render(timestep)
+            except BaseException:
+                # continue with a fresh figure
+                del self._local.frames
+                with self._lock:
+                    self._warm.remove(warm)
+                warm.close()
+                raise
+            yield timestep, frame
+
+    def render(self, timesteps, compress=True):
+        """Rendered frames for `timesteps`, as PNG files (`compress`) or RGBA pictures"""
+        frames = []
+        for timestep, frame in self._frames(timesteps):
+            if not isinstance(frame, np.ndarray):
+                # copied, since the canvas is reused for the next frame
+                frame = np.array(_frame_buffer(frame, dpi=self.movie.dpi))
+            frames.append(_png(frame, self.movie.compress_level) if compress else frame)
+        return frames
+
+
+def _render_batch(name, timesteps, compress):
+    worker = get_worker()
+    return worker.address, worker.plugins[name].render(timesteps, compress=compress)
+
+
+def iter_frames(
+    movie, timesteps, client=None, batch_size=1, compress=True, max_pending=None, progress=None
+):
+    """Render `timesteps` of `movie` on the workers of `client` (the current client by
+    default), yielding ``(timestep, frame)`` in order.
+
+    Batches of `batch_size` frames are rendered as tasks, and at most `max_pending`
+    batches (twice the number of worker threads by default) are submitted ahead of
+    the next frame. Batches that complete early wait in a reorder buffer.
+    """
+    if client is None:
+        client = get_client()
+    timesteps = list(timesteps)
+    batches = [timesteps[i : i + batch_size] for i in range(0, len(timesteps), batch_size)]
+    if max_pending is None:
+        max_pending = 2 * sum(client.nthreads().values())
+
+    name = "xmovie-%s" % uuid.uuid4().hex
+    # `register_plugin` is only available in newer versions of distributed
+    register = getattr(client, "register_plugin", None) or client.register_worker_plugin
+    register(MovieWorkerPlugin(movie, name))
+    futures = {}
+    completed = as_completed()
+    rendered = {}
+    submitted = 0
+    try:
+        for index, batch in enumerate(batches):
+            while submitted < min(len(batches), index + max(max_pending, 1)):
+                future = client.submit(_render_batch, name, batches[submitted], compress, pure=False)
+                futures[future] = submitted
+                completed.add(future)
+                submitted += 1
+            while index not in rendered:
+                future = next(completed)
+                worker, frames = future.result()
+                done = futures.pop(future)
+                rendered[done] = frames
+                if progress is not None:
+                    progress.update(batches[done], worker=worker)
+            yield from zip(batch, rendered.pop(index))
+    finally:
+        for future in futures:
+            future.cancel()
+        client.unregister_worker_plugin(name)
@@ -1,16 +1,39 @@
 import matplotlib as mpl
 
 mpl.use("Agg")
+import collections
+import contextlib
+import functools
 import gc
 import glob
+import io
+import json
+import multiprocessing
 import os
+import queue
 import re
+import shlex
+import shutil
+import socket
 import sys
+import tempfile
+import threading
+import time
 import warnings
-from subprocess import PIPE, STDOUT, Popen
+from concurrent.futures import (
+    FIRST_EXCEPTION,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from subprocess import DEVNULL, PIPE, STDOUT, Popen
 
 import matplotlib.pyplot as plt
+import numpy as np
 import xarray as xr
+from PIL import Image
+from xarray.backends import BackendArray
+from xarray.core import indexing
 
 from .presets import basic
 
@@ -27,7 +50,8 @@ except Exception:
 
 # import xarray as xr
 # import dask.bag as db
-import dask.array as dsa
+# dask is imported lazily (see `_tokenize`), since it is slow to import and only
+# needed for dask-backed data and `save_frames_parallel`
 
 # is it a good idea to set these here?
 # Needs to be dependent on dpi and videosize
@@ -35,7 +59,129 @@ plt.rcParams.update({"font.size": 14})
 
 
 # Data treatment
-def _parse_plot_defaults(da, kwargs):
+def _sample_index(n, n_frames):
+    """Indices of `n_frames` of `n` frames, evenly spaced"""
+    return np.unique(np.linspace(0, n - 1, min(n_frames, n)).round().astype(int))
+
+
+def _sample_frames(data, framedim, n_frames):
+    """Select `n_frames` frames, evenly spaced along `framedim`"""
+    return data.isel({framedim: _sample_index(len(data[framedim]), n_frames)})
+
+
+_DECIMATE_METHODS = ["mean", "max", "min", "nearest"]
+
+
+def _decimate(data, framedim, pixels, method="mean"):
+    """Reduce every dimension but `framedim` to at most about `pixels` points.
+
+    Each dimension longer than `pixels` is reduced in blocks of the smallest
+    integer size that fits, taking the mean/max/min of each block or its first
+    element ('nearest'). This is lazy for dask-backed data, so only the reduced
+    data is computed when the frames are plotted.
+    """
+    if method not in _DECIMATE_METHODS:
+        raise ValueError("`decimate` has to be one of %s. Got %r" % (_DECIMATE_METHODS, method))
+    factors = {
+        dim: -(-size // pixels) for dim, size in data.sizes.items() if dim != framedim and size > pixels
+    }
+    if not factors:
+        return data
+    if method == "nearest":
+        return data.isel({dim: slice(None, None, factor) for dim, factor in factors.items()})
+    coarse = data.coarsen(factors, boundary="pad", coord_func="mean")
+    return getattr(coarse, method)(keep_attrs=True)
+
+
+def _tokenize(*args):
+    """Deterministic token of `args` (see :func:`dask.base.tokenize`)"""
+    from dask.base import tokenize
+
+    return tokenize(*args)
+
+
+# percentiles computed for every block of dask-backed data to estimate robust limits
+_BLOCK_PERCENTILES = np.linspace(0, 100, 1001)
+
+
+def _block_percentiles(block):
+    """Number of finite values of `block` and either those values (sorted), if there
+    are only a few, or their percentiles `_BLOCK_PERCENTILES`"""
+    values = np.asarray(block, dtype=float).ravel()
+    values = values[~np.isnan(values)]
+    if values.size <= len(_BLOCK_PERCENTILES):
+        return values.size, np.sort(values), True
+    return values.size, np.percentile(values, _BLOCK_PERCENTILES), False
+
+
+def _merge_percentiles(blocks, q):
+    """Percentiles `q` of all values of `blocks` (see `_block_percentiles`).
+
+    This is exact if all blocks returned their values, and otherwise interpolates
+    the distribution of all values from the percentiles of every block.
+    """
+    blocks = [block for block in blocks if block[0]]
+    if not blocks:
+        return np.full(len(q), np.nan)
+    if all(exact for _, _, exact in blocks):
+        return np.percentile(np.concatenate([values for _, values, _ in blocks]), q)
+    percentiles = [
+        (n, np.percentile(values, _BLOCK_PERCENTILES) if exact else values)
+        for n, values, exact in blocks
+    ]
+    values = np.unique(np.concatenate([p for _, p in percentiles]))
+    # fraction of all values below `values`, weighted by the size of the blocks
+    cdf = sum(n * np.interp(values, p, _BLOCK_PERCENTILES) for n, p in percentiles)
+    return np.interp(q, cdf * 100 / cdf[-1], values)
+
+
+def _color_limits(data, robust=False, framedim=None, sample=None, cache_dir=None):
+    """Compute the color limits (vmin, vmax) of `data` in a single pass.
+
+    With `robust` the 2nd and 98th percentiles are used (like in xarray). For
+    dask-backed data they are estimated from the percentiles of every block
+    (see `_merge_percentiles`), without loading all data at once. With `sample` only that
+    many frames along `framedim` are used to estimate the limits. If `cache_dir` is
+    given, the result is stored there, keyed on the dask token of the data.
+    """
+    if sample is not None:
+        data = _sample_frames(data, framedim, sample)
+
+    cache_file = None
+    if cache_dir is not None:
+        # for data opened from files, the token includes the filename and modification time
+        cache_file = os.path.join(cache_dir, "limits_%s.json" % _tokenize(data, robust))
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                cached = json.load(f)
+            return cached["vmin"], cached["vmax"]
+
+    if data.chunks is None:
+        if robust:
+            vmin, vmax = np.nanpercentile(np.asarray(data.values, dtype=float), [2, 98])
+        else:
+            vmin, vmax = data.min().values, data.max().values
+    else:
+        import dask
+
+        if robust:
+            # each block is only reduced to its percentiles
+            blocks = [
+                dask.delayed(_block_percentiles)(block) for block in data.data.to_delayed().ravel()
+            ]
+            vmin, vmax = dask.delayed(_merge_percentiles)(blocks, [2, 98]).compute()
+        else:
+            # computing both together only reads lazy data once
+            vmin, vmax = (v.values for v in dask.compute(data.min(), data.max()))
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, "w") as f:
+            json.dump(dict(vmin=vmin.item(), vmax=vmax.item()), f)
+    return vmin, vmax
+
+
+def _parse_plot_defaults(da, kwargs, framedim=None, limits_sample=None, limits_cache=None):
     if isinstance(da, xr.DataArray):
         data = da
     else:
@@ -47,14 +193,23 @@ def _parse_plot_defaults(da, kwargs):
             "No `vmin` provided. Data limits are calculated from input. Depending on the input this can take long. Pass `vmin` to avoid this step",
             UserWarning,
         )
-        kwargs["vmin"] = data.min().data
 
     if "vmax" not in kwargs.keys():
         warnings.warn(
             "No `vmax` provided. Data limits are calculated from input. Depending on the input this can take long. Pass `vmax` to avoid this step",
             UserWarning,
         )
-        kwargs["vmax"] = data.max().data
+
+    if "vmin" not in kwargs.keys() or "vmax" not in kwargs.keys():
+        vmin, vmax = _color_limits(
+            data,
+            robust=kwargs.get("robust", False),
+            framedim=framedim,
+            sample=limits_sample,
+            cache_dir=limits_cache,
+        )
+        kwargs.setdefault("vmin", vmin)
+        kwargs.setdefault("vmax", vmax)
 
     # There is a bug that prevents this from working...Ill have to fix that upstream.
     # defaults["cbar_kwargs"] = dict(extend="neither")
@@ -62,8 +217,9 @@ def _parse_plot_defaults(da, kwargs):
     kwargs.setdefault("extend", "neither")
 
     # if any value is dask.array compute them here.
+    dsa = sys.modules.get("dask.array")
     for k in ["vmin", "vmax"]:
-        if isinstance(kwargs[k], dsa.Array):
+        if dsa is not None and isinstance(kwargs[k], dsa.Array):
             kwargs[k] = kwargs[k].compute()
 
     return kwargs
@@ -81,8 +237,25 @@ def _check_plotfunc_output(func, da, framedim="time", **kwargs):
         return len(oargs)
 
 
+def _has_update_protocol(plotfunc):
+    """Check if `plotfunc` provides the `setup`/`update` protocol, which allows
+    the figure and artists to be reused across frames."""
+    return callable(getattr(plotfunc, "setup", None)) and callable(getattr(plotfunc, "update", None))
+
+
+def _has_render_protocol(plotfunc):
+    """Check if `plotfunc` can also `render` frames as RGBA pictures without drawing the figure"""
+    return _has_update_protocol(plotfunc) and callable(getattr(plotfunc, "render", None))
+
+
+@functools.lru_cache(maxsize=None)
 def _check_ffmpeg_version():
-    p = Popen("ffmpeg -version", stdout=PIPE, shell=True)
+    # probed once per process
+    try:
+        p = Popen(["ffmpeg", "-version"], stdout=PIPE)
+    except FileNotFoundError:
+        print("No ffmpeg found")
+        return None
     (output, err) = p.communicate()
     p_status = p.wait()
     # Parse version
@@ -100,28 +273,235 @@ def _check_ffmpeg_version():
     return found
 
 
-def _execute_command(command, verbose=False, error=True):
-    p = Popen(command, stdout=PIPE, stderr=STDOUT, shell=True)
+# named encoder settings that can be passed as `ffmpeg_options`, from the fastest
+FFMPEG_PROFILES = {
+    "draft": "-c:v libx264 -preset ultrafast -crf 28 -pix_fmt yuv420p",
+    "balanced": "-c:v libx264 -preset medium -crf 18 -pix_fmt yuv420p",
+    "archive": "-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p",
+}
+
+# candidates for `ffmpeg_options="auto"` from the fastest, with the profile whose quality they reach
+_AUTO_ENCODERS = [
+    ("balanced", "-c:v h264_nvenc -preset p4 -cq 19 -pix_fmt yuv420p"),
+    ("balanced", "-c:v h264_videotoolbox -q:v 65 -pix_fmt yuv420p"),
+    ("balanced", "-c:v h264_qsv -preset fast -global_quality 20 -pix_fmt nv12"),
+    ("draft", FFMPEG_PROFILES["draft"]),
+    ("draft", "-c:v mpeg4 -q:v 5 -pix_fmt yuv420p"),
+    ("balanced", FFMPEG_PROFILES["balanced"]),
+    ("balanced", "-c:v mpeg4 -q:v 2 -pix_fmt yuv420p"),
+    ("archive", FFMPEG_PROFILES["archive"]),
+]
+
+_FFmpegCapabilities = collections.namedtuple("_FFmpegCapabilities", ["encoders", "pix_fmts"])
+
+
+def _ffmpeg_list(option):
+    # flags and names of the table printed by e.g. `ffmpeg -encoders`, below its `---` line
+    p = Popen(["ffmpeg", "-hide_banner", option], stdout=PIPE, stderr=DEVNULL)
+    output, _ = p.communicate()
+    lines = output.decode(errors="replace").splitlines()
+    start = next((i for i, line in enumerate(lines) if line.strip().startswith("---")), len(lines))
+    return [line.split()[:2] for line in lines[start + 1 :] if len(line.split()) >= 2]
+
+
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_capabilities():
+    """Video encoders and output pixel formats of ffmpeg, probed once per process"""
+    if _check_ffmpeg_version() is None:
+        return _FFmpegCapabilities(frozenset(), frozenset())
+    return _FFmpegCapabilities(
+        encoders=frozenset(name for flags, name in _ffmpeg_list("-encoders") if flags.startswith("V")),
+        pix_fmts=frozenset(name for flags, name in _ffmpeg_list("-pix_fmts") if flags[1:2] == "O"),
+    )
 
-    if verbose:
-        while True:
-            out = p.stdout.read(1)
-            out_check = out.decode()
-            if out_check == "" and p.poll() is not None:
-                break
-            if out_check != "":
-                # only display 10 lines, this cant be that hard?
-                sys.stdout.write(out)
-                sys.stdout.flush()
-    else:
-        p.wait()
-    if error:
-        if p.returncode != 0:
-            raise RuntimeError("Command %s failed" % command)
+
+@functools.lru_cache(maxsize=None)
+def _encoder_works(ffmpeg_options):
+    # listed (hardware) encoders can still be unusable, so encode a short test video
+    command = "ffmpeg -v error -f lavfi -i color=size=256x256:duration=0.2 %s -f null -" % ffmpeg_options
+    return Popen(shlex.split(command), stdout=DEVNULL, stderr=DEVNULL).wait() == 0
+
+
+def _ffmpeg_option(ffmpeg_options, name):
+    args = shlex.split(ffmpeg_options)
+    return args[args.index(name) + 1] if name in args[:-1] else None
+
+
+def _auto_ffmpeg_options(quality="balanced"):
+    """Settings of the fastest available encoder that reaches the quality of the profile `quality`"""
+    qualities = list(FFMPEG_PROFILES)
+    if quality not in qualities:
+        raise ValueError("Unknown quality `%s`. Choose from %s." % (quality, qualities))
+    capabilities = _ffmpeg_capabilities()
+    for candidate_quality, ffmpeg_options in _AUTO_ENCODERS:
+        if qualities.index(candidate_quality) < qualities.index(quality):
+            continue
+        if (
+            _ffmpeg_option(ffmpeg_options, "-c:v") in capabilities.encoders
+            and _ffmpeg_option(ffmpeg_options, "-pix_fmt") in capabilities.pix_fmts
+            and _encoder_works(ffmpeg_options)
+        ):
+            return ffmpeg_options
+    raise RuntimeError("Could not find an ffmpeg encoder that reaches `%s` quality." % quality)
+
+
+def _ffmpeg_options(ffmpeg_options):
+    """Encoder settings of a profile name (see `FFMPEG_PROFILES` and `Movie.save`) or the given settings"""
+    if ffmpeg_options in FFMPEG_PROFILES:
+        return FFMPEG_PROFILES[ffmpeg_options]
+    if ffmpeg_options == "auto" or ffmpeg_options.startswith("auto:"):
+        return _auto_ffmpeg_options(ffmpeg_options.partition(":")[2] or "balanced")
+    return ffmpeg_options
+
+
+# `key=value` lines of `ffmpeg -progress`
+_PROGRESS_LINE = re.compile(r"^(\w+)=(.*)$")
+
+
+def _progress_value(key, value):
+    value = value.strip()
+    if key == "bitrate" and value.endswith("kbits/s"):
+        # in kbit/s
+        value = value[: -len("kbits/s")]
+    for convert in [int, float]:
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    # e.g. "N/A"
+    return None if value == "N/A" else value
+
+
+class FFmpegProcess:
+    """Handle of a command (usually ffmpeg) running in the background.
+
+    The command is run without a shell. Its output is read line by line on a
+    background thread, so a chatty encoder can never block. ffmpeg reports its
+    progress (``-progress pipe:1``) in events like ``{"frame": 120, "fps": 59.9,
+    "bitrate": 1024.5, "out_time_us": 8000000, "speed": "2x", "progress": "continue"}``
+    (the bitrate in kbit/s), the latest of which is :attr:`progress`.
+
+    Parameters
+    ----------
+    command : str
+        Command to run.
+    verbose : bool
+        Print the output of the command.
+    callback : callable, optional
+        Called with every progress event.
+    """
+
+    def __init__(self, command, verbose=False, callback=None):
+        self.command = command
+        self.verbose = verbose
+        self.callback = callback
+        self.progress = {}
+        # the end of the output, for error messages
+        self.output = collections.deque(maxlen=10)
+        self._event = {}
+        self._done_callbacks = []
+        self._errors = []
+        self._lock = threading.Lock()
+        self._finished = False
+        args = shlex.split(command)
+        if os.path.basename(args[0]) == "ffmpeg":
+            args[1:1] = ["-progress", "pipe:1", "-nostats"]
+        self.process = Popen(
+            args, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT, bufsize=1, text=True, errors="replace"
+        )
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            line = line.rstrip("\n")
+            match = _PROGRESS_LINE.match(line)
+            if match is None:
+                if line:
+                    self.output.append(line)
+                    if self.verbose:
+                        print(line)
+                continue
+            key, value = match.groups()
+            self._event[key] = _progress_value(key, value)
+            if key == "progress":
+                # the last key of every event
+                self.progress, self._event = self._event, {}
+                if self.verbose:
+                    print(
+                        "frame=%s fps=%s bitrate=%skbits/s"
+                        % tuple(self.progress.get(key) for key in ["frame", "fps", "bitrate"])
+                    )
+                self._call(self.callback, self.progress)
+        self.process.wait()
+        with self._lock:
+            self._finished = True
+            callbacks = list(self._done_callbacks)
+        for callback in callbacks:
+            self._call(callback, self)
+
+    def _call(self, callback, argument):
+        if callback is None:
+            return
+        try:
+            callback(argument)
+        except Exception as e:
+            # raised by `wait`
+            self._errors.append(e)
+
+    @property
+    def returncode(self):
+        """Exit code of the command, ``None`` while it runs."""
+        return self.process.returncode if self._finished else None
+
+    def poll(self):
+        """Return the exit code of the command, or ``None`` while it runs."""
+        return self.returncode
+
+    def add_done_callback(self, callback):
+        """Call `callback` with this handle once the command finished (right away if it did)."""
+        with self._lock:
+            if not self._finished:
+                self._done_callbacks.append(callback)
+                return
+        self._call(callback, self)
+
+    def wait(self, timeout=None, error=True):
+        """Wait for the command to finish and return the handle.
+
+        Raises a RuntimeError if the command failed (unless `error` is ``False``),
+        and a TimeoutError if it did not finish within `timeout` seconds.
+        """
+        self._reader.join(timeout)
+        if self._reader.is_alive():
+            raise TimeoutError("Command %s did not finish within %s seconds" % (self.command, timeout))
+        if error and self.returncode != 0:
+            msg = "Command %s failed" % self.command
+            if self.output:
+                msg += " with output:\n%s" % "\n".join(self.output)
+            raise RuntimeError(msg)
+        if self._errors:
+            raise self._errors[0]
+        return self
+
+    def cancel(self):
+        """Stop the command."""
+        self.process.kill()
+        self._reader.join()
+
+
+def _execute_command(command, verbose=False, error=True, wait=True, callback=None):
+    try:
+        p = FFmpegProcess(command, verbose=verbose, callback=callback)
+    except FileNotFoundError:
+        raise RuntimeError("Command %s failed" % command)
+    if wait:
+        p.wait(error=error)
     return p
 
 
-def _check_ffmpeg_execute(command, verbose=False):
+def _check_ffmpeg_execute(command, verbose=False, wait=True, callback=None):
+    """Run the ffmpeg `command`, in the background unless `wait` is set"""
     if _check_ffmpeg_version() is None:
         raise RuntimeError(
             "Could not find an ffmpeg version on the system. \
@@ -129,19 +509,24 @@ def _check_ffmpeg_execute(command, verbose=False):
         )
     else:
         try:
-            p = _execute_command(command, verbose=verbose)
+            p = _execute_command(command, verbose=verbose, wait=wait, callback=callback)
             return p
-        except RuntimeError:
+        except RuntimeError as e:
             raise RuntimeError(
                 "Something has gone wrong. Use `verbose=True` to check if ffmpeg displays a problem"
-            )
+            ) from e
 
 
-def _combine_ffmpeg_command(sourcefolder, moviename, framerate, frame_pattern, ffmpeg_options):
+def _combine_ffmpeg_command(
+    sourcefolder, moviename, framerate, frame_pattern, ffmpeg_options, frames=None
+):
     # we need `-y` because i can not properly diagnose the errors here...
-    command = 'ffmpeg -r %i -i "%s" -y %s -r %i "%s"' % (
+    # `frames` (a range) only encodes a segment of the frames
+    command = 'ffmpeg %s-r %i -i "%s" %s-y %s -r %i "%s"' % (
+        "" if frames is None else "-start_number %i " % frames.start,
         framerate,
         os.path.join(sourcefolder, frame_pattern),
+        "" if frames is None else "-frames:v %i " % len(frames),
         ffmpeg_options,
         framerate,
         os.path.join(sourcefolder, moviename),
@@ -149,6 +534,111 @@ def _combine_ffmpeg_command(sourcefolder, moviename, framerate, frame_pattern, f
     return command
 
 
+def _concat_ffmpeg_command(listfile, moviename):
+    # the segments are joined without encoding them again
+    command = 'ffmpeg -f concat -safe 0 -i "%s" -y -c copy "%s"' % (listfile, moviename)
+    return command
+
+
+def _png_pipe_input(framerate):
+    # PNG files read from stdin, one after the other
+    return "-f image2pipe -c:v png -r %i -i -" % framerate
+
+
+def _rawvideo_input(frame_size, framerate, source="-", offset=None):
+    # raw RGBA frames (as produced by the Agg canvas), read from stdin by default
+    return "-f rawvideo -pix_fmt rgba -s %ix%i -r %i %s-i %s" % (
+        frame_size[0],
+        frame_size[1],
+        framerate,
+        "" if offset is None else "-skip_initial_bytes %i " % offset,
+        source,
+    )
+
+
+def _stream_ffmpeg_command(moviename, framerate, frame_size, ffmpeg_options, inputs=None):
+    # `inputs` replaces the raw frames read from stdin (e.g. with PNG files)
+    command = 'ffmpeg %s -y %s -r %i "%s"' % (
+        _rawvideo_input(frame_size, framerate) if inputs is None else inputs,
+        ffmpeg_options,
+        framerate,
+        moviename,
+    )
+    return command
+
+
+def _gif_ffmpeg_command(inputs, gpath, gif_framerate, resolution, palette=None):
+    # the gif is encoded straight from the frames, `palette` is a picture made by `palettegen`
+    filters = "fps=%i,scale=%i:%i" % (gif_framerate, resolution[0], resolution[1])
+    if palette is None:
+        return 'ffmpeg %s -vf "%s" -y "%s"' % (inputs, filters, gpath)
+    return 'ffmpeg %s -i "%s" -lavfi "%s [x]; [x][1:v] paletteuse" -y "%s"' % (
+        inputs,
+        palette,
+        filters,
+        gpath,
+    )
+
+
+class _FFmpegStream:
+    """Long-lived ffmpeg process that encodes raw frames written to its stdin."""
+
+    def __init__(self, command, verbose=False):
+        if _check_ffmpeg_version() is None:
+            raise RuntimeError(
+                "Could not find an ffmpeg version on the system. \
+            Please install ffmpeg with e.g. `conda install -c conda-forge ffmpeg`"
+            )
+        self.command = command
+        # Keep the ffmpeg log in a file instead of a PIPE, so that a chatty
+        # encoder can never block the process we are writing frames into.
+        self._log = None if verbose else tempfile.TemporaryFile()
+        self.process = Popen(
+            shlex.split(command),
+            stdin=PIPE,
+            stdout=None if verbose else DEVNULL,
+            stderr=None if verbose else self._log,
+        )
+
+    def _error(self):
+        msg = "Command %s failed" % self.command
+        if self._log is not None:
+            self._log.seek(0)
+            log = self._log.read().decode(errors="replace").strip()
+            if log:
+                msg += " with output:\n%s" % "\n".join(log.splitlines()[-10:])
+        return RuntimeError(msg)
+
+    def write(self, buffer):
+        try:
+            self.process.stdin.write(buffer)
+        except (BrokenPipeError, OSError):
+            # ffmpeg exited early, surface its output instead of the broken pipe
+            self.process.wait()
+            raise self._error()
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.wait()
+        if self._log is not None:
+            error = self._error() if self.process.returncode != 0 else None
+            self._log.close()
+            if error is not None:
+                raise error
+        elif self.process.returncode != 0:
+            raise self._error()
+        return self.process
+
+    def abort(self):
+        self.process.kill()
+        self.process.wait()
+        if self._log is not None:
+            self._log.close()
+
+
 # def create_gif_palette(mpath, ppath="palette.png", verbose=False):
 #     command = "ffmpeg -y -i %s -vf palettegen %s" % (mpath, ppath)
 #     p = _check_ffmpeg_execute(command, verbose=verbose)
@@ -194,19 +684,252 @@ def combine_frames_into_movie(
     verbose=False,
     ffmpeg_options="-c:v libx264 -preset veryslow -crf 15 -pix_fmt yuv420p",
     framerate=20,
+    wait=True,
 ):
+    ffmpeg_options = _ffmpeg_options(ffmpeg_options)
     command = _combine_ffmpeg_command(sourcefolder, moviename, framerate, frame_pattern, ffmpeg_options)
-    p = _check_ffmpeg_execute(command, verbose=verbose)
+    # with `wait=False` the movie is encoded in the background
+    p = _check_ffmpeg_execute(command, verbose=verbose, wait=False)
 
-    print("Movie created at %s" % (moviename))
-    if remove_frames:
-        rem_name = frame_pattern.replace("%05d", "*")
-        for f in glob.glob(os.path.join(sourcefolder, rem_name)):
-            if os.path.exists(f):
-                os.remove(f)
+    def _created(p):
+        if p.returncode == 0:
+            print("Movie created at %s" % (moviename))
+            if remove_frames:
+                _remove_frames(sourcefolder, frame_pattern)
+
+    p.add_done_callback(_created)
+    if wait:
+        p.wait()
     return p
 
 
+def _remove_frames(sourcefolder, frame_pattern):
+    rem_name = frame_pattern.replace("%05d", "*")
+    for f in glob.glob(os.path.join(sourcefolder, rem_name)):
+        if os.path.exists(f):
+            os.remove(f)
+
+
+def _store_ffmpeg_command(path, offset, moviename, framerate, frame_size, ffmpeg_options, n_frames=None):
+    # the frames are read as raw RGBA video, after the header of the .npy file
+    command = 'ffmpeg %s %s-y %s -r %i "%s"' % (
+        _rawvideo_input(frame_size, framerate, '"%s"' % path, offset),
+        "" if n_frames is None else "-frames:v %i " % n_frames,
+        ffmpeg_options,
+        framerate,
+        moviename,
+    )
+    return command
+
+
+def _gif_palette(pictures, path, verbose=False):
+    """Generates the gif palette `path` from a sample of RGBA `pictures`"""
+    command = 'ffmpeg %s -vf palettegen -y "%s"' % (_rawvideo_input(pictures[0].shape[1::-1], 1), path)
+    stream = _FFmpegStream(command, verbose=verbose)
+    for picture in pictures:
+        stream.write(np.ascontiguousarray(picture))
+    stream.close()
+
+
+class _SegmentEncoder:
+    """Encodes contiguous segments of the frames with concurrent ffmpeg processes and
+    concatenates them into the movie.
+
+    A segment is encoded as soon as all of its frames are saved (see `done`), the
+    remaining segments when the encoder is closed. `command(frames, segment)`
+    returns the ffmpeg command that encodes the range `frames` into the file `segment`.
+    """
+
+    def __init__(self, moviename, n_frames, segments, command, verbose=False):
+        root, ext = os.path.splitext(moviename)
+        self.moviename = moviename
+        self.segments = [
+            (range(frames[0], frames[-1] + 1), "%s_segment_%03i%s" % (root, index, ext))
+            for index, frames in enumerate(np.array_split(np.arange(n_frames), min(segments, n_frames)))
+        ]
+        self.command = command
+        self.verbose = verbose
+        self._pending = [set(frames) for frames, _ in self.segments]
+        self._processes = {}
+        # frames of parallel workers are reported from other threads
+        self._lock = threading.Lock()
+
+    def _start(self, index):
+        frames, segment = self.segments[index]
+        self._processes[index] = _FFmpegStream(self.command(frames, segment), verbose=self.verbose)
+
+    def done(self, frames):
+        """Start encoding the segments whose frames are all saved"""
+        with self._lock:
+            for index, pending in enumerate(self._pending):
+                if index not in self._processes:
+                    pending.difference_update(frames)
+                    if not pending:
+                        self._start(index)
+
+    def close(self):
+        """Encode the remaining segments and concatenate all of them into the movie"""
+        listfile = os.path.splitext(self.moviename)[0] + "_segments.txt"
+        try:
+            with self._lock:
+                for index in range(len(self.segments)):
+                    if index not in self._processes:
+                        self._start(index)
+            for index in range(len(self.segments)):
+                self._processes[index].close()
+            with open(listfile, "w") as f:
+                for _, segment in self.segments:
+                    # the paths are relative to the list
+                    f.write("file '%s'\n" % os.path.basename(segment).replace("'", "'\\''"))
+            return _check_ffmpeg_execute(
+                _concat_ffmpeg_command(listfile, self.moviename), verbose=self.verbose
+            )
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            for path in [listfile] + [segment for _, segment in self.segments]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def abort(self):
+        for process in self._processes.values():
+            process.abort()
+        for _, segment in self.segments:
+            if os.path.exists(segment):
+                os.remove(segment)
+
+
+class FrameStore:
+    """Single file that holds the RGBA pictures of all frames of a movie.
+
+    The frames are stored in a preallocated ``.npy`` file with the shape
+    ``(n_frames, height, width, 4)``, one slot per frame number. Frames can be
+    written concurrently (also from other processes), and ffmpeg reads the file
+    directly, so the frames can be encoded again without rendering them.
+
+    Parameters
+    ----------
+    path : path
+        Path to a frame store created with :meth:`create`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._frames = None
+
+    @classmethod
+    def create(cls, path, n_frames, width, height):
+        """Preallocate a frame store for `n_frames` frames of `width` x `height` pixels."""
+        np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(n_frames, height, width, 4))
+        return cls(path)
+
+    def __getstate__(self):
+        # workers map the file themselves
+        return {"path": self.path, "_frames": None}
+
+    @property
+    def frames(self):
+        """Memory-mapped array of the frames."""
+        if self._frames is None:
+            self._frames = np.load(self.path, mmap_mode="r+")
+        return self._frames
+
+    def __len__(self):
+        return self.frames.shape[0]
+
+    @property
+    def frame_size(self):
+        """Width and height of the frames in pixels."""
+        return self.frames.shape[2], self.frames.shape[1]
+
+    def write(self, frame, picture):
+        """Write the RGBA `picture` of `frame` into its slot."""
+        picture = np.asarray(picture)
+        if picture.shape != self.frames.shape[1:]:
+            raise RuntimeError(
+                "Frame %i has a size of %s pixels, but the frame store holds frames of %s."
+                % (frame, picture.shape[1::-1], self.frame_size)
+            )
+        self.frames[frame] = picture
+
+    def flush(self):
+        if self._frames is not None:
+            self._frames.flush()
+
+    def _input(self, framerate):
+        return _rawvideo_input(self.frame_size, framerate, '"%s"' % self.path, self.frames.offset)
+
+    def _command(self, moviename, framerate, ffmpeg_options, frames=None):
+        offset = self.frames.offset
+        if frames is not None:
+            offset += frames.start * self.frames[0].nbytes
+        return _store_ffmpeg_command(
+            self.path,
+            offset,
+            moviename,
+            framerate,
+            self.frame_size,
+            ffmpeg_options,
+            n_frames=None if frames is None else len(frames),
+        )
+
+    def encode(
+        self,
+        moviename,
+        framerate=15,
+        ffmpeg_options="-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p",
+        verbose=False,
+        segments=None,
+        wait=True,
+    ):
+        """Encode the stored frames into the movie file `moviename`.
+
+        Parameters
+        ----------
+        moviename : path
+            Path to the output movie file.
+        framerate : int
+            Frames per second for the output movie file.
+        ffmpeg_options : str
+            Encoding options to pass to ffmpeg call, or the name of a profile
+            (see :meth:`Movie.save`).
+        verbose : bool
+            Show output of the ffmpeg process.
+        segments : int, optional
+            Encode this many contiguous segments of the frames concurrently and
+            concatenate them into the movie.
+        wait : bool
+            Wait for the movie to be encoded. Otherwise return the
+            :class:`FFmpegProcess` encoding it in the background right away.
+            Requires encoding without `segments`.
+        """
+        self.flush()
+        ffmpeg_options = _ffmpeg_options(ffmpeg_options)
+        if segments:
+            if not wait:
+                raise ValueError("Encoding segments (`segments`) requires `wait=True`.")
+            encoder = self._segment_encoder(moviename, framerate, ffmpeg_options, segments, verbose)
+            return encoder.close()
+        command = self._command(moviename, framerate, ffmpeg_options)
+        return _check_ffmpeg_execute(command, verbose=verbose, wait=wait)
+
+    def _segment_encoder(self, moviename, framerate, ffmpeg_options, segments, verbose=False):
+        return _SegmentEncoder(
+            moviename,
+            len(self),
+            segments,
+            lambda frames, segment: self._command(segment, framerate, ffmpeg_options, frames),
+            verbose=verbose,
+        )
+
+    def remove(self):
+        """Remove the file of the frame store."""
+        self._frames = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
 # def create_frame(pixelwidth, pixelheight, dpi):
 #     """Creates a Figure sized according to the pixeldimensions"""
 #     fig = plt.figure()
@@ -214,14 +937,108 @@ def combine_frames_into_movie(
 #     return fig
 
 
-def save_single_frame(fig, frame, odir=None, frame_pattern="frame_%05d.png", dpi=100):
-    """Saves a single frame of data from an already-created figure and then closes the figure"""
-    fig.savefig(
-        os.path.join(odir, frame_pattern % (frame)),
-        dpi=dpi,
-        facecolor=fig.get_facecolor(),
-        transparent=True,
-    )
+def _frame_buffer(fig, dpi=100):
+    """Draws `fig` on its Agg canvas and returns the RGBA pixel buffer"""
+    if fig.dpi != dpi:
+        fig.set_dpi(dpi)
+    fig.canvas.draw()
+    return fig.canvas.buffer_rgba()
+
+
+class _FigureBlitter:
+    """Draws a figure by compositing its animated artists with a cached picture of
+    the static artists, and of the static artists above them (the overlay).
+
+    The cached pictures are drawn again whenever a static artist changed, which
+    marks the figure as stale (changes to animated artists do not).
+    """
+
+    def __init__(self, fig, dpi=100):
+        self.fig = fig
+        self.dpi = dpi
+        self.background = None
+        self.overlay = None
+
+    def _layers(self, dynamic):
+        fig = self.fig
+        fig.canvas.draw()
+        self.background = fig.canvas.copy_from_bbox(fig.bbox)
+        background = np.array(fig.canvas.buffer_rgba()).reshape(-1, 4)
+        # static artists above the lowest animated artist of their axes
+        overlays = []
+        for ax in {artist.axes for artist in dynamic if artist.axes is not None}:
+            zorder = min(artist.get_zorder() for artist in dynamic if artist.axes is ax)
+            overlays += [
+                artist
+                for artist in ax.get_children()
+                if artist.get_visible() and not artist.get_animated() and artist.get_zorder() > zorder
+            ]
+        fig.canvas.get_renderer().clear()
+        for artist in sorted(overlays, key=lambda artist: artist.get_zorder()):
+            fig.draw_artist(artist)
+        overlay = np.asarray(fig.canvas.buffer_rgba()).reshape(-1, 4)
+        # drawing the overlay again (e.g. placing the ticks) does not change the figure
+        fig.stale = False
+        # only the covered pixels of the overlay are blended on top of each frame
+        index = np.flatnonzero(overlay[:, 3])
+        self.overlay = (
+            index,
+            background[index],
+            overlay[index, :3].astype(np.float32),
+            overlay[index, 3:] / np.float32(255),
+        )
+
+    def draw(self):
+        """Draw the figure and return its RGBA picture"""
+        fig = self.fig
+        if fig.dpi != self.dpi:
+            fig.set_dpi(self.dpi)
+        dynamic = fig.findobj(lambda artist: artist.get_animated() and artist.get_visible())
+        if not dynamic:
+            return np.array(_frame_buffer(fig, dpi=self.dpi))
+        if fig.stale or self.background is None:
+            self._layers(dynamic)
+        fig.canvas.restore_region(self.background)
+        for artist in sorted(dynamic, key=lambda artist: artist.get_zorder()):
+            fig.draw_artist(artist)
+        picture = np.array(fig.canvas.buffer_rgba())
+        index, background, color, alpha = self.overlay
+        pixels = picture.reshape(-1, 4)
+        # the background already shows the overlay where nothing was drawn on top
+        drawn = (pixels[index] != background).any(axis=-1)
+        index, color, alpha = index[drawn], color[drawn], alpha[drawn]
+        pixels[index, :3] = (color * alpha + pixels[index, :3] * (1 - alpha)).round()
+        return picture
+
+
+def _frame_picture(fig, dpi=100):
+    """RGBA picture of `fig`, exactly as :func:`save_single_frame` saves it"""
+    if fig.dpi != dpi:
+        fig.set_dpi(dpi)
+    width, height = fig.canvas.get_width_height()
+    with io.BytesIO() as buffer:
+        fig.savefig(buffer, format="rgba", dpi=dpi, facecolor=fig.get_facecolor(), transparent=True)
+        return np.frombuffer(buffer.getvalue(), dtype=np.uint8).reshape(height, width, 4)
+
+
+def save_single_frame(
+    fig, frame, odir=None, frame_pattern="frame_%05d.png", dpi=100, close=True, compress_level=None
+):
+    """Saves a single frame of data from an already-created figure and then closes the figure
+    (unless `close` is False). `compress_level` sets the zlib compression (0-9) of png files."""
+    path = os.path.join(odir, frame_pattern % (frame))
+    if _picture_format(path):
+        _save_picture(_frame_picture(fig, dpi=dpi), frame, odir, frame_pattern, dpi=dpi)
+    else:
+        fig.savefig(
+            path,
+            dpi=dpi,
+            facecolor=fig.get_facecolor(),
+            transparent=True,
+            pil_kwargs=None if compress_level is None else dict(compress_level=compress_level),
+        )
+    if not close:
+        return
     # I am trying everything to *wipe* this figure, hoping that it could
     # help with the dask glitches I experienced earlier.
     # TBD if this is all needed...how this might affect performance.
@@ -230,6 +1047,668 @@ def save_single_frame(fig, frame, odir=None, frame_pattern="frame_%05d.png", dpi
     gc.collect(2)
 
 
+def _picture_format(path):
+    """Uncompressed formats that are written from the RGBA picture of a frame (not by matplotlib)"""
+    extension = os.path.splitext(path)[1].lower()
+    return extension if extension in [".ppm", ".bmp", ".pam"] else None
+
+
+def _load_picture(path):
+    """Reads the RGBA picture of a saved frame"""
+    if _picture_format(path) != ".pam":
+        return np.array(Image.open(path).convert("RGBA"))
+    header = {}
+    with open(path, "rb") as f:
+        for line in iter(f.readline, b""):
+            if line == b"ENDHDR\n":
+                break
+            key, _, value = line.decode().partition(" ")
+            header[key] = value.strip()
+        return np.fromfile(f, dtype=np.uint8).reshape(int(header["HEIGHT"]), int(header["WIDTH"]), 4)
+
+
+def _save_picture(
+    picture, frame, odir=None, frame_pattern="frame_%05d.png", dpi=100, compress_level=None
+):
+    """Saves a single frame that was rendered as an RGBA `picture`.
+
+    ``.ppm`` and ``.bmp`` files are written without alpha channel, ``.pam`` files hold
+    the raw RGBA values behind a short header.
+    """
+    path = os.path.join(odir, frame_pattern % (frame))
+    picture_format = _picture_format(path)
+    if picture_format == ".pam":
+        height, width = picture.shape[:2]
+        with open(path, "wb") as f:
+            f.write(
+                b"P7\nWIDTH %i\nHEIGHT %i\nDEPTH 4\nMAXVAL 255\nTUPLTYPE RGB_ALPHA\nENDHDR\n"
+                % (width, height)
+            )
+            f.write(np.ascontiguousarray(picture).data)
+    elif picture_format is not None:
+        Image.fromarray(np.ascontiguousarray(picture[..., :3])).save(path)
+    else:
+        pil_kwargs = None if compress_level is None else dict(compress_level=compress_level)
+        plt.imsave(path, picture, dpi=dpi, pil_kwargs=pil_kwargs)
+
+
+class _FrameWriter:
+    """Saves frames on a pool of `max_workers` threads (or right away without).
+
+    :meth:`submit` and :meth:`wait` return the frames that were saved since, in the
+    order they were submitted, and raise the errors of failed writes.
+    """
+
+    def __init__(self, max_workers=0):
+        self.executor = ThreadPoolExecutor(max_workers) if max_workers else None
+        # bounds the memory of pictures waiting to be written
+        self.max_pending = 2 * max_workers
+        self.pending = collections.deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            # let running writes finish (errors of unfinished frames are dropped)
+            for frame, future in self.pending:
+                future.cancel()
+            self.executor.shutdown(wait=True)
+
+    def submit(self, frame, func, *args):
+        if self.executor is None:
+            func(*args)
+            return [frame]
+        self.pending.append((frame, self.executor.submit(func, *args)))
+        done = []
+        while self.pending and (self.pending[0][1].done() or len(self.pending) > self.max_pending):
+            frame, future = self.pending.popleft()
+            future.result()
+            done.append(frame)
+        return done
+
+    def wait(self):
+        done = []
+        while self.pending:
+            frame, future = self.pending.popleft()
+            future.result()
+            done.append(frame)
+        return done
+
+
+class _FrameManifest:
+    """Append-only record of the frames saved into `odir`.
+
+    Each line holds a frame index and the token of the movie settings that
+    produced it, so frames rendered with other settings are recognized as stale.
+    """
+
+    filename = "xmovie_manifest.jsonl"
+
+    def __init__(self, odir, token):
+        self.path = os.path.join(odir, self.filename)
+        self.token = token
+
+    def completed(self, frame_pattern):
+        """Frames recorded with the current token whose picture file still exists"""
+        frames = set()
+        if not os.path.exists(self.path):
+            return frames
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a line cut short by a crashed run
+                    continue
+                if entry.get("token") == self.token:
+                    frames.add(entry["frame"])
+        odir = os.path.dirname(self.path)
+        return {frame for frame in frames if os.path.exists(os.path.join(odir, frame_pattern % frame))}
+
+    def record(self, frame):
+        # a single short write in append mode, so that parallel workers do not interleave
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"frame": int(frame), "token": self.token}) + "\n")
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _FrameCache:
+    """On-disk cache of frame files, keyed on everything that determines their pixels.
+
+    The least recently used frames are evicted once the cache grows beyond
+    `max_size` bytes.
+    """
+
+    def __init__(self, directory, max_size=None):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+    def get(self, key, path):
+        """Copy the cached frame for `key` to `path`. Returns False if it is not cached."""
+        source = self._path(key, os.path.splitext(path)[1])
+        try:
+            shutil.copyfile(source, path)
+            # mark as recently used
+            os.utime(source)
+        except FileNotFoundError:
+            # not cached (or evicted by another process in the meantime)
+            return False
+        return True
+
+    def put(self, key, path):
+        """Add the frame file at `path` to the cache"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(path, tmp)
+        # other processes never see partially written frames
+        os.replace(tmp, self._path(key, os.path.splitext(path)[1]))
+        if self.max_size is not None:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+
+def _rss():
+    """Current resident memory of this process in bytes (None if unknown)"""
+    try:
+        # Linux
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+class SaveProfile:
+    """Timings of the stages of saving a movie, as returned by ``Movie.save(..., profile=True)``.
+
+    Each record in :attr:`records` is a dict with the `frame` (None for stages that
+    are not specific to a frame), the `stage`, its `start` (seconds since the epoch)
+    and `duration` (seconds), the resident memory of the process at the end of the
+    stage (`rss`, bytes) and its change during the stage (`rss_delta`, bytes), and
+    the `host`, `pid` and `thread` it ran in. The memory is None if it is unknown
+    (on platforms without ``/proc`` and without psutil).
+
+    The stages are ``"setup"`` (of a reused figure), ``"load"`` (the data of the
+    frame), ``"plot"`` (the plot function), ``"savefig"`` (drawing and encoding
+    the picture file), ``"close"`` (closing the figure and garbage collection),
+    ``"cache"`` (frame cache lookups), ``"draw"`` and ``"write"`` (drawing and piping
+    a frame into ffmpeg with ``intermediate='stream'``, or copying it into the
+    frame store with ``intermediate='store'``), ``"prefetch"`` (a batch of
+    prefetched frames, on a background thread), ``"ffmpeg"`` and ``"gif"``. With
+    ``writers``, frames are drawn (``"draw"``) before ``"savefig"`` encodes and
+    writes them on a writer thread.
+    """
+
+    fields = ["frame", "stage", "start", "duration", "rss", "rss_delta", "host", "pid", "thread"]
+
+    def __init__(self, records=None):
+        self.records = [] if records is None else list(records)
+
+    @contextlib.contextmanager
+    def stage(self, stage, frame=None):
+        """Context manager recording the time spent in its body as `stage` of `frame`"""
+        start = time.time()
+        start_rss = _rss()
+        timer = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - timer
+            rss = _rss()
+            self.records.append(
+                dict(
+                    frame=None if frame is None else int(frame),
+                    stage=stage,
+                    start=start,
+                    duration=duration,
+                    rss=rss,
+                    rss_delta=None if rss is None else rss - start_rss,
+                    host=socket.gethostname(),
+                    pid=os.getpid(),
+                    thread=threading.get_ident(),
+                )
+            )
+
+    def extend(self, records):
+        self.records.extend(records)
+
+    def to_dataframe(self):
+        """All records as a :class:`pandas.DataFrame`"""
+        import pandas as pd
+
+        return pd.DataFrame(self.records, columns=self.fields)
+
+    def summary(self):
+        """Number of calls and total, mean and maximum duration per stage"""
+        df = self.to_dataframe()
+        return df.groupby("stage", sort=False)["duration"].agg(["count", "sum", "mean", "max"])
+
+    def to_jsonl(self, path):
+        """Write the records to `path`, one JSON object per line"""
+        with open(path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+
+    def to_chrome_trace(self, path):
+        """Write the records to `path` in the Chrome trace event format.
+
+        The trace can be viewed in ``chrome://tracing`` or https://ui.perfetto.dev,
+        with one row per worker process and thread.
+        """
+        events = [
+            {
+                "name": record["stage"],
+                "cat": "xmovie",
+                "ph": "X",
+                "ts": record["start"] * 1e6,
+                "dur": record["duration"] * 1e6,
+                "pid": "%s:%i" % (record["host"], record["pid"]),
+                "tid": record["thread"],
+                "args": {key: record[key] for key in ["frame", "rss", "rss_delta"]},
+            }
+            for record in self.records
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def _worker_name():
+    """Name of the current worker: host and process (and thread, unless it is the main thread)"""
+    name = "%s:%i" % (socket.gethostname(), os.getpid())
+    thread = threading.current_thread()
+    if thread is not threading.main_thread():
+        name += ":%s" % thread.name
+    return name
+
+
+class SaveProgress:
+    """Progress of saving the frames of a movie, as reported by ``Movie.save(..., progress=...)``.
+
+    :meth:`update` is called whenever frames are saved, serially, by dask tasks
+    (per chunk, as soon as it is saved with dask's local schedulers) and by the
+    workers of ``executor='processes'``. :attr:`workers` counts the frames saved
+    by each worker (``"host:pid"``, with the thread of threaded workers).
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames to save.
+    callback : callable, optional
+        Called with the progress after every update, e.g. to report
+        :meth:`summary` to a job monitoring.
+    bar : bool
+        Show a progress bar. Requires tqdm.
+    """
+
+    def __init__(self, n_frames, callback=None, bar=False):
+        self.n_frames = n_frames
+        self.frames_done = 0
+        self.workers = collections.Counter()
+        self.callback = callback
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._bar = None
+        if bar and tqdm_avail:
+            self._bar = tqdm(total=n_frames, unit="frame")
+        elif bar:
+            warnings.warn("Cant show progess bar at this point. Install tqdm")
+
+    def update(self, frames, worker=None):
+        """Record that `frames` were saved by `worker` (the current one by default)"""
+        with self._lock:
+            self.frames_done += len(frames)
+            self.workers[_worker_name() if worker is None else worker] += len(frames)
+            if self._bar is not None:
+                self._bar.update(len(frames))
+            if self.callback is not None:
+                self.callback(self)
+
+    @property
+    def elapsed(self):
+        """Seconds since saving started"""
+        return time.perf_counter() - self.start
+
+    @property
+    def fps(self):
+        """Frames saved per second"""
+        return self.frames_done / self.elapsed
+
+    @property
+    def eta(self):
+        """Estimated seconds until all frames are saved (``None`` before the first frame)"""
+        if not self.frames_done:
+            return None
+        return (self.n_frames - self.frames_done) / self.fps
+
+    def summary(self):
+        """Frames done, frames per second and ETA overall and per worker, as a dict"""
+        elapsed = self.elapsed
+        return dict(
+            frames_done=self.frames_done,
+            n_frames=self.n_frames,
+            elapsed=elapsed,
+            fps=self.frames_done / elapsed,
+            eta=self.eta,
+            workers={worker: dict(frames_done=n, fps=n / elapsed) for worker, n in self.workers.items()},
+        )
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+
+    def __repr__(self):
+        eta = self.eta
+        return "<SaveProgress: %i/%i frames, %.2f frames/s, ETA %s>" % (
+            self.frames_done,
+            self.n_frames,
+            self.fps,
+            "unknown" if eta is None else "%.0fs" % eta,
+        )
+
+
+def _save_progress(progress, n_frames):
+    """:class:`SaveProgress` for the `progress` argument of the saving methods (or None)"""
+    if not progress:
+        return None
+    if isinstance(progress, SaveProgress):
+        return progress
+    if callable(progress):
+        return SaveProgress(n_frames, callback=progress)
+    return SaveProgress(n_frames, bar=True)
+
+
+def _chain_callbacks(*callbacks):
+    """Callback that calls all of `callbacks` which are not None"""
+    callbacks = [callback for callback in callbacks if callback is not None]
+    if len(callbacks) < 2:
+        return callbacks[0] if callbacks else None
+
+    def _chained(*args):
+        for callback in callbacks:
+            callback(*args)
+
+    return _chained
+
+
+class _PrefetchedArray(BackendArray):
+    """Lazily indexed view of a lazy variable, which takes frames that were loaded
+    ahead of time from a `_FramePrefetcher` (or `_LoadedFrames`, `_CurrentFrame`)"""
+
+    def __init__(self, prefetcher, name, variable):
+        self.prefetcher = prefetcher
+        self.name = name
+        self.variable = variable
+        self.axis = variable.dims.index(prefetcher.framedim)
+        self.shape = variable.shape
+        self.dtype = variable.dtype
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(
+            key, self.shape, indexing.IndexingSupport.BASIC, self._getitem
+        )
+
+    def _getitem(self, key):
+        frame = key[self.axis]
+        if isinstance(frame, (int, np.integer)):
+            loaded = self.prefetcher.frame(frame)
+            if loaded is not None:
+                return loaded[self.name][key[: self.axis] + key[self.axis + 1 :]]
+        # anything else is loaded as usual
+        return np.asarray(self.variable[key].values)
+
+
+def _frame_variables(data, framedim):
+    """The dask-backed variables of `data` along `framedim`, by name (None for a DataArray)"""
+    if isinstance(data, xr.DataArray):
+        variables = {None: data.variable}
+    else:
+        variables = {name: var.variable for name, var in data.data_vars.items()}
+    return {
+        name: var for name, var in variables.items() if framedim in var.dims and var.chunks is not None
+    }
+
+
+def _with_loaded_frames(data, loader):
+    """Copy of `data` whose variables `loader.variables` take their frames from
+    `loader` (see `_PrefetchedArray`), and load all other indices as usual"""
+    wrapped = {
+        name: xr.Variable(
+            var.dims,
+            indexing.LazilyIndexedArray(_PrefetchedArray(loader, name, var)),
+            var.attrs,
+            var.encoding,
+        )
+        for name, var in loader.variables.items()
+    }
+    if isinstance(data, xr.DataArray):
+        return xr.DataArray(wrapped[None], coords=data.coords, name=data.name, attrs=data.attrs)
+    data = data.copy()
+    for name, var in wrapped.items():
+        data[name] = var
+    return data
+
+
+class _LoadedFrames:
+    """Frames `timesteps` of the dask-backed `variables` (see `_frame_variables`),
+    loaded into memory as `arrays` (by variable name) with all frames of a chunk"""
+
+    def __init__(self, framedim, variables, timesteps, arrays):
+        self.framedim = framedim
+        self.variables = variables
+        self.timesteps = list(timesteps)
+        self.arrays = arrays
+
+    def frame(self, timestep):
+        """The arrays of frame `timestep` by variable name, or None if it is not loaded"""
+        if timestep not in self.timesteps:
+            return None
+        i = self.timesteps.index(timestep)
+        return {
+            name: np.take(array, i, axis=self.variables[name].dims.index(self.framedim))
+            for name, array in self.arrays.items()
+        }
+
+
+class _CurrentFrame:
+    """The frame of `data` that is rendered, loaded before plotting it.
+
+    Plot functions get :attr:`data`, which takes the loaded frame and loads
+    anything else as usual, so loading is timed separately from plotting.
+    """
+
+    def __init__(self, data, framedim):
+        self.framedim = framedim
+        if isinstance(data, xr.DataArray):
+            variables = {None: data.variable}
+        else:
+            variables = {name: var.variable for name, var in data.data_vars.items()}
+        # lazy (dask-backed, prefetched or file-backed) variables along `framedim`
+        self.variables = {
+            name: var for name, var in variables.items() if framedim in var.dims and not var._in_memory
+        }
+        self.data = _with_loaded_frames(data, self) if self.variables else data
+        self._timestep = None
+        self._arrays = None
+
+    def load(self, timestep):
+        """Load the frame `timestep`"""
+        self._timestep = None
+        self._arrays = {
+            name: np.asarray(var.isel({self.framedim: timestep}).values)
+            for name, var in self.variables.items()
+        }
+        self._timestep = timestep
+
+    def frame(self, timestep):
+        """The arrays of frame `timestep` by variable name, or None if it is not loaded"""
+        return self._arrays if timestep == self._timestep else None
+
+
+class _FramePrefetcher:
+    """Loads the frames `timesteps` of `data` on a background thread.
+
+    The frames are loaded in batches of `batch_size` frames with a single
+    ``dask.compute`` each, at most `depth` batches ahead of the frame that is
+    rendered. :attr:`data` is a copy of `data` that takes frames from the loaded
+    batches (when requested in order), so that it can be passed to the plot function.
+    Without `batch_size` (or dask-backed variables) :attr:`data` is `data` itself.
+    """
+
+    def __init__(self, data, framedim, timesteps, batch_size, depth=2, profile=None):
+        self.framedim = framedim
+        self.profile = profile
+        self.variables = _frame_variables(data, framedim)
+
+        self.data = data
+        self._thread = None
+        if not batch_size or not self.variables:
+            # nothing to load ahead
+            return
+        self.data = _with_loaded_frames(data, self)
+
+        timesteps = list(timesteps)
+        self._batches = [timesteps[i : i + batch_size] for i in range(0, len(timesteps), batch_size)]
+        self._pending = set(timesteps)
+        self._frames = {}
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._load, daemon=True)
+        self._thread.start()
+
+    def _load_batch(self, batch):
+        arrays = {}
+        for name, var in self.variables.items():
+            index = [slice(None)] * var.ndim
+            index[var.dims.index(self.framedim)] = batch
+            arrays[name] = var.data[tuple(index)]
+        import dask
+
+        with _stage(self.profile, "prefetch"):
+            (arrays,) = dask.compute(arrays)
+        return arrays
+
+    def _load(self):
+        for batch in self._batches:
+            try:
+                item = (batch, self._load_batch(batch))
+            except Exception:
+                # the frames are loaded again when rendered, which raises the error there
+                item = (batch, None)
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if self._stop.is_set():
+                return
+
+    def frame(self, timestep):
+        """The arrays of frame `timestep` by variable name, or None if it is not prefetched"""
+        if timestep in self._frames:
+            return self._frames[timestep]
+        # only wait for frames that are still to come
+        while timestep in self._pending:
+            batch, arrays = self._queue.get()
+            self._pending.difference_update(batch)
+            # frames of previous batches are not needed anymore
+            self._frames = {}
+            if arrays is not None:
+                for i, t in enumerate(batch):
+                    self._frames[t] = {
+                        name: np.take(array, i, axis=self.variables[name].dims.index(self.framedim))
+                        for name, array in arrays.items()
+                    }
+        return self._frames.get(timestep)
+
+    def close(self):
+        if self._thread is not None:
+            # unblock the loader
+            self._stop.set()
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _stage(profile, stage, frame=None):
+    """Record `stage` in `profile`, if given"""
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.stage(stage, frame)
+
+
+# Movie of the current worker process (see `Movie.save_frames_processes`)
+_worker_movie = None
+# queue the worker reports its saved frames to (see `_report_progress`)
+_worker_progress = None
+
+
+def _init_worker(movie, progress_queue=None):
+    global _worker_movie, _worker_progress
+    _worker_movie = movie
+    _worker_progress = progress_queue
+
+
+def _report_progress(queue, worker, timesteps):
+    queue.put((worker, list(timesteps)))
+
+
+def _read_progress(queue, progress):
+    # frames saved by the workers, until None is put into the queue
+    for worker, timesteps in iter(queue.get, None):
+        progress.update(timesteps, worker=worker)
+
+
+def _save_frames_worker(odir, timesteps, manifest=None, retries=0, profile=False, writers=0):
+    profile = SaveProfile() if profile else None
+    # saved frames are reported to the progress in the parent process right away
+    callback = None
+    if _worker_progress is not None:
+        callback = functools.partial(_report_progress, _worker_progress, _worker_name())
+    _worker_movie._save_frames(
+        odir,
+        timesteps,
+        manifest=manifest,
+        retries=retries,
+        profile=profile,
+        writers=writers,
+        callback=callback,
+    )
+    return [] if profile is None else profile.records
+
+
 class Movie:
     """Movie class, describing how to construct an animation from associated data."""
 
@@ -244,6 +1723,13 @@ class Movie:
         frame_pattern="frame_%05d.png",
         fieldname=None,
         input_check=True,
+        limits_sample=None,
+        limits_cache=None,
+        frame_cache=None,
+        frame_cache_size=None,
+        decimate=None,
+        blit=False,
+        compress_level=None,
         **kwargs,
     ):
         """
@@ -254,6 +1740,9 @@ class Movie:
         plotfunc : Callable
             Function to plot a single frame, with
             :ref:`the same signature as the presets <api:Presets>`.
+            If `plotfunc` also provides ``setup`` and ``update`` attributes
+            (like the presets), a single figure is set up once and updated
+            for every frame instead.
 
             Default: :func:`~xmovie.presets.basic`.
         framedim : str
@@ -263,9 +1752,42 @@ class Movie:
         dpi : int
             Movie resolution.
         frame_pattern : str
-            Filename pattern when saving frames.
+            Filename pattern when saving frames. The extension selects the format
+            of the frames: ``.png``, the uncompressed ``.ppm`` and ``.bmp``,
+            ``.pam`` (raw RGBA values with a short header), or any other format
+            matplotlib can save to.
         fieldname
             Currently unused.
+        limits_sample : int, optional
+            If `vmin`/`vmax` are not given, estimate them from only this many
+            frames (evenly spaced along `framedim`) instead of the full data.
+        limits_cache : path, optional
+            Directory to cache computed `vmin`/`vmax` in, so that they are not
+            computed again for a new Movie over the same data.
+        frame_cache : path, optional
+            Directory to cache saved frames in. Frames are taken from the cache
+            instead of being rendered again if their data, `plotfunc`, `kwargs`,
+            size and resolution are unchanged, also across Movies.
+        frame_cache_size : int, optional
+            Maximum size of `frame_cache` in bytes. The least recently used
+            frames are removed beyond that. Default: unlimited.
+        decimate : bool or {'mean', 'max', 'min', 'nearest'}, optional
+            Coarsen the data to about the movie size in pixels before plotting,
+            by taking the mean/max/min of blocks of grid cells or only every
+            n-th cell ('nearest'). ``True`` is the same as 'mean'. For dask-backed
+            data this is part of the dask graph, so that only the reduced data
+            is loaded for every frame. Color limits are computed from the
+            original data.
+        blit : bool
+            Draw the static parts of the figure (e.g. axes, colorbar, coastlines)
+            only once, and for every frame only the artists that change, on top of
+            that picture. Requires a `plotfunc` with ``setup`` and ``update``, which
+            is set up with ``blit=True`` and marks the artists that change as
+            animated (:meth:`~matplotlib.artist.Artist.set_animated`). The static
+            parts are drawn again whenever they change.
+        compress_level : int, optional
+            zlib compression level (0-9) of ``.png`` frames. Lower levels save
+            faster but need more disk space. Default: matplotlib's default (6).
         **kwargs
             Passed on to `plotfunc`.
         """
@@ -276,8 +1798,13 @@ class Movie:
         self.width = self.pixelwidth / self.dpi
         self.height = self.pixelheight / self.dpi
         self.frame_pattern = frame_pattern
+        self.compress_level = compress_level
         self.data = da
         self.framedim = framedim
+        if frame_cache is None:
+            self.frame_cache = None
+        else:
+            self.frame_cache = _FrameCache(frame_cache, max_size=frame_cache_size)
         if plotfunc is None:
             self.plotfunc = basic
         else:
@@ -287,6 +1814,11 @@ class Movie:
 
         # Check input
 
+        # Mandatory checks
+        # Check if `framedim` exists.
+        if self.framedim not in list(self.data.dims):
+            raise ValueError("Framedim (%s) not found in input data" % self.framedim)
+
         # optional checks (these might need to be deactivated when using custom
         # plot functions.)
         if input_check:
@@ -296,18 +1828,171 @@ class Movie:
                 )
 
             # Set defaults
-            self.kwargs = _parse_plot_defaults(self.data, self.raw_kwargs)
+            self.kwargs = _parse_plot_defaults(
+                self.data,
+                self.raw_kwargs,
+                framedim=self.framedim,
+                limits_sample=limits_sample,
+                limits_cache=limits_cache,
+            )
         else:
             self.kwargs = self.raw_kwargs
 
-        # Mandatory checks
-        # Check if `framedim` exists.
-        if self.framedim not in list(self.data.dims):
-            raise ValueError("Framedim (%s) not found in input data" % self.framedim)
-        # Check the output of plotfunc
-        self.plotfunc_n_outargs = _check_plotfunc_output(
-            self.plotfunc, self.data, self.framedim, **self.kwargs
-        )
+        if decimate is True:
+            decimate = "mean"
+        if decimate:
+            # the axes are at most as large as the figure
+            pixels = max(self.pixelwidth, self.pixelheight)
+            self.data = _decimate(self.data, self.framedim, pixels, method=decimate)
+        self.decimate = decimate
+
+        if blit and not _has_update_protocol(self.plotfunc):
+            raise ValueError("`blit` requires a `plotfunc` with `setup` and `update` methods.")
+        self.blit = blit
+
+        # The output of plotfunc is checked when the first frame is rendered
+        self._plotfunc_n_outargs = None
+
+    @property
+    def plotfunc_n_outargs(self):
+        """Number of values returned by :attr:`plotfunc` (``ax, pp`` are expected).
+
+        Plot functions with ``setup`` and ``update`` methods always return ``ax, pp``.
+        Otherwise this is known once a frame was rendered, and a trial frame is
+        rendered if it is needed before.
+        """
+        if _has_update_protocol(self.plotfunc):
+            return 2
+        if self._plotfunc_n_outargs is None:
+            self._plotfunc_n_outargs = _check_plotfunc_output(
+                self.plotfunc, self.data, self.framedim, **self.kwargs
+            )
+        return self._plotfunc_n_outargs
+
+    def _new_figure(self):
+        return plt.figure(figsize=[self.width, self.height], dpi=self.dpi)
+
+    def _frame_size(self):
+        # width and height of the frames in pixels, as drawn by the canvas
+        fig = self._new_figure()
+        size = fig.canvas.get_width_height()
+        plt.close(fig)
+        return size
+
+    def _sample_pictures(self, source=None, n_frames=16):
+        """RGBA pictures of a sample of the frames, read from `source` (an output
+        directory or a FrameStore) or rendered"""
+        timesteps = _sample_index(len(self.data[self.framedim]), n_frames).tolist()
+        if isinstance(source, FrameStore):
+            return [source.frames[timestep] for timestep in timesteps]
+        if source is not None:
+            return [_load_picture(self._frame_path(source, timestep)) for timestep in timesteps]
+        pictures = []
+        for timestep, frame in self._iter_frames(timesteps):
+            if not isinstance(frame, np.ndarray):
+                frame = _frame_buffer(frame, dpi=self.dpi)
+            # the figure is reused for the next frame
+            pictures.append(np.array(frame))
+        return pictures
+
+    def _gif_palette(self, gpath, gif_palette, source=None, verbose=False):
+        """Path to the palette of the gif `gpath`, which is generated unless it was cached"""
+        if gif_palette is True:
+            path = os.path.splitext(gpath)[0] + "_palette.png"
+        else:
+            # palettes are reused for the same frames
+            os.makedirs(gif_palette, exist_ok=True)
+            token = _tokenize(self.data, self._plot_settings())
+            path = os.path.join(gif_palette, "palette_%s.png" % token)
+            if os.path.exists(path):
+                return path
+        _gif_palette(self._sample_pictures(source), path, verbose=verbose)
+        return path
+
+    def _encode_gif(
+        self, inputs, gpath, gif_framerate, resolution, gif_palette, source, verbose=False, wait=True
+    ):
+        """Encode the gif `gpath` from the frames read by the ffmpeg `inputs`"""
+        palette = self._gif_palette(gpath, gif_palette, source, verbose=verbose) if gif_palette else None
+
+        def _created(p=None):
+            if palette is not None and gif_palette is True:
+                os.remove(palette)
+            if p is not None and p.returncode == 0:
+                print("GIF created at %s" % (gpath))
+
+        try:
+            command = _gif_ffmpeg_command(inputs, gpath, gif_framerate, resolution, palette=palette)
+            p = _check_ffmpeg_execute(command, verbose=verbose, wait=False)
+        except BaseException:
+            _created()
+            raise
+        p.add_done_callback(_created)
+        if wait:
+            p.wait()
+        return p
+
+    def _iter_frames(self, timesteps, profile=None, data=None):
+        """Render the frames for `timesteps`, yielding ``(timestep, fig)``.
+
+        The figure is closed (or reused for the next frame) when the next frame is
+        requested, so it has to be saved before that. `data` replaces :attr:`data`
+        (e.g. with prefetched frames). Plot functions with a ``render`` method yield
+        RGBA pictures (as arrays) instead of the figure.
+        """
+        if data is None:
+            data = self.data
+        if _has_render_protocol(self.plotfunc):
+            fig = self._new_figure()
+            try:
+                with _stage(profile, "setup"):
+                    state = self.plotfunc.setup(fig, data, self.framedim, **self.kwargs)
+                pictures = self.plotfunc.render(state, timesteps)
+                while True:
+                    # frames may be rendered in batches, so this is not specific to a frame
+                    with _stage(profile, "plot"):
+                        frame = next(pictures, None)
+                    if frame is None:
+                        return
+                    yield frame
+            finally:
+                plt.close(fig)
+        elif _has_update_protocol(self.plotfunc):
+            current = _CurrentFrame(data, self.framedim)
+            fig = self._new_figure()
+            try:
+                kwargs = dict(self.kwargs, blit=True) if self.blit else self.kwargs
+                with _stage(profile, "setup"):
+                    state = self.plotfunc.setup(fig, current.data, self.framedim, **kwargs)
+                blitter = _FigureBlitter(fig, dpi=self.dpi) if self.blit else None
+                for timestep in timesteps:
+                    with _stage(profile, "load", timestep):
+                        current.load(timestep)
+                    with _stage(profile, "plot", timestep):
+                        self.plotfunc.update(state, timestep)
+                    if blitter is None:
+                        yield timestep, fig
+                    else:
+                        with _stage(profile, "draw", timestep):
+                            picture = blitter.draw()
+                        yield timestep, picture
+            finally:
+                plt.close(fig)
+        else:
+            current = _CurrentFrame(data, self.framedim)
+            for timestep in timesteps:
+                with _stage(profile, "load", timestep):
+                    current.load(timestep)
+                with _stage(profile, "plot", timestep):
+                    fig, ax, pp = self._render_frame(timestep, current.data)
+                try:
+                    yield timestep, fig
+                finally:
+                    with _stage(profile, "close", timestep):
+                        # see `save_single_frame`
+                        plt.close(fig)
+                        del fig
+                        gc.collect(2)
 
     def render_single_frame(self, timestep):
         """renders complete figure (frame) for given timestep.
@@ -324,20 +2009,28 @@ class Movie:
         pp
             Matplotlib primitives returned by the plotting function.
         """
-        fig = plt.figure(figsize=[self.width, self.height])
+        return self._render_frame(timestep, self.data)
+
+    def _render_frame(self, timestep, data):
+        fig = self._new_figure()
         # create_frame(self.pixelwidth, self.pixelheight, self.dpi)
-        # produce dummy output for ax and pp if the plotfunc does not provide them
-        if self.plotfunc_n_outargs == 2:
-            # this should be the case for all presets provided by xmovie
-            ax, pp = self.plotfunc(self.data, fig, timestep, self.framedim, **self.kwargs)
+        if _has_update_protocol(self.plotfunc):
+            state = self.plotfunc.setup(fig, data, self.framedim, **self.kwargs)
+            ax, pp = self.plotfunc.update(state, timestep)
         else:
-            warnings.warn(
-                "The provided `plotfunc` does not provide the expected number of output arguments.\
-            Expected a function `ax,pp =plotfunc(...)` but got %i output arguments. Inserting dummy values. This should not affect output. ",
-                UserWarning,
-            )
-            _ = self.plotfunc(self.data, fig, timestep, self.framedim, **self.kwargs)
-            ax, pp = None, None
+            oargs = self.plotfunc(data, fig, timestep, self.framedim, **self.kwargs)
+            self._plotfunc_n_outargs = 0 if oargs is None else len(oargs)
+            # produce dummy output for ax and pp if the plotfunc does not provide them
+            if self._plotfunc_n_outargs == 2:
+                ax, pp = oargs
+            else:
+                warnings.warn(
+                    "The provided `plotfunc` does not provide the expected number of output arguments.\
+            Expected a function `ax,pp =plotfunc(...)` but got %i output arguments. Inserting dummy values. This should not affect output. "
+                    % self._plotfunc_n_outargs,
+                    UserWarning,
+                )
+                ax, pp = None, None
         return fig, ax, pp
 
     def preview(self, timestep):
@@ -351,45 +2044,463 @@ class Movie:
         with plt.rc_context({"figure.dpi": self.dpi, "figure.figsize": [self.width, self.height]}):
             fig, ax, pp = self.render_single_frame(timestep)
 
-    def save_frames_serial(self, odir, progress=False):
+    def _frame_range(self, frame_range=None):
+        # create range of frames
+        if frame_range is None:
+            frame_range = range(len(self.data[self.framedim].data))
+        return frame_range
+
+    def _plot_settings(self):
+        # everything besides the data that determines the pixels of a frame
+        plotfunc = self.plotfunc if callable(self.plotfunc) else type(self.plotfunc)
+        return (
+            self.framedim,
+            getattr(plotfunc, "__module__", None),
+            getattr(plotfunc, "__qualname__", repr(plotfunc)),
+            self.kwargs,
+            self.pixelwidth,
+            self.pixelheight,
+            self.dpi,
+            self.blit,
+        )
+
+    def _manifest(self, odir):
+        # frames are only reused if everything that determines their pixels is unchanged
+        token = _tokenize(self.data, self._plot_settings(), self.frame_pattern)
+        return _FrameManifest(odir, token)
+
+    def _frame_key(self, timestep):
+        # presets like `rotating_globe` also depend on the position of the frame in the movie
+        frame_data = self.data.isel({self.framedim: timestep})
+        n_frames = len(self.data[self.framedim])
+        return _tokenize(frame_data, timestep, n_frames, self._plot_settings())
+
+    def _frame_path(self, odir, timestep):
+        return os.path.join(odir, self.frame_pattern % timestep)
+
+    def _pending_frames(self, odir, resume):
+        """Manifest (if resuming) and the frames that still need to be saved"""
+        frames = range(len(self.data[self.framedim]))
+        if not resume:
+            return None, frames
+        if isinstance(odir, FrameStore):
+            raise ValueError("Resuming (`resume=True`) requires saving frames as picture files.")
+        manifest = self._manifest(odir)
+        completed = manifest.completed(self.frame_pattern)
+        return manifest, [frame for frame in frames if frame not in completed]
+
+    def save_frames_serial(
+        self,
+        odir,
+        progress=False,
+        resume=False,
+        retries=0,
+        profile=None,
+        prefetch=0,
+        prefetch_depth=2,
+        writers=0,
+        callback=None,
+    ):
         """Save movie frames as picture files.
 
         Parameters
         ----------
-        odir : path
-            Path to the output directory.
-        progress : bool
-            Show progress bar. Requires tqdm.
+        odir : path or FrameStore
+            Path to the output directory, or the frame store the frames are written into.
+        progress : bool, callable or SaveProgress
+            Show progress bar (requires tqdm), or call this with the
+            :class:`SaveProgress` whenever frames are saved.
+        resume : bool
+            Record saved frames in a manifest in `odir` and skip frames that were
+            already saved there with the same settings.
+        retries : int
+            Number of times failed frames are rendered again before giving up.
+        profile : SaveProfile, optional
+            Record the time spent in each stage of saving the frames.
+        prefetch : int
+            Load the data of this many frames at once on a background thread while
+            the previous frames are rendered. Only applies to dask-backed data.
+            Default: load each frame when it is plotted.
+        prefetch_depth : int
+            Maximum number of batches of `prefetch` frames loaded ahead.
+        writers : int
+            Number of threads that encode and write the picture files, while the
+            next frames are rendered. Default: write each frame after rendering it.
+        callback : callable, optional
+            Called with the list of frames that were saved, whenever frames are saved.
         """
-        # create range of frames
-        frame_range = range(len(self.data[self.framedim].data))
-        if tqdm_avail and progress:
-            frame_range = tqdm(frame_range)
-        elif ~tqdm_avail and progress:
-            warnings.warn("Cant show progess bar at this point. Install tqdm")
+        manifest, frames = self._pending_frames(odir, resume)
+        frames = self._frame_range(frame_range=frames)
+        progress = _save_progress(progress, len(frames))
+        try:
+            with _FramePrefetcher(
+                self.data, self.framedim, frames, prefetch, depth=prefetch_depth, profile=profile
+            ) as prefetcher:
+                self._save_frames(
+                    odir,
+                    frames,
+                    manifest=manifest,
+                    retries=retries,
+                    profile=profile,
+                    data=prefetcher.data,
+                    writers=writers,
+                    callback=_chain_callbacks(callback, None if progress is None else progress.update),
+                )
+        finally:
+            if progress is not None:
+                progress.close()
 
-        for timestep in frame_range:
-            fig, ax, pp = self.render_single_frame(timestep)
-            save_single_frame(fig, timestep, odir=odir, frame_pattern=self.frame_pattern, dpi=self.dpi)
+    def _save_frames(
+        self,
+        odir,
+        timesteps,
+        manifest=None,
+        retries=0,
+        profile=None,
+        data=None,
+        writers=0,
+        callback=None,
+    ):
+        """Save the frames for `timesteps`, rendering failed frames again up to `retries` times"""
+        if not retries:
+            self._try_save_frames(
+                odir,
+                timesteps,
+                manifest,
+                raise_errors=True,
+                profile=profile,
+                data=data,
+                writers=writers,
+                callback=callback,
+            )
+            return
+        for attempt in range(retries + 1):
+            timesteps, error = self._try_save_frames(
+                odir,
+                timesteps,
+                manifest,
+                raise_errors=False,
+                profile=profile,
+                data=data,
+                writers=writers,
+                callback=callback,
+            )
+            if not timesteps:
+                return
+        raise RuntimeError(
+            "Saving frames %s failed after %i attempts." % (timesteps, retries + 1)
+        ) from error
+
+    def _save_frame(self, frame, odir, timestep, profile=None):
+        """Save a rendered frame (a figure or an RGBA picture)"""
+        if isinstance(odir, FrameStore):
+            if not isinstance(frame, np.ndarray):
+                with _stage(profile, "draw", timestep):
+                    frame = _frame_buffer(frame, dpi=self.dpi)
+            with _stage(profile, "write", timestep):
+                odir.write(timestep, frame)
+            return
+        with _stage(profile, "savefig", timestep):
+            if isinstance(frame, np.ndarray):
+                _save_picture(
+                    frame,
+                    timestep,
+                    odir=odir,
+                    frame_pattern=self.frame_pattern,
+                    dpi=self.dpi,
+                    compress_level=self.compress_level,
+                )
+            else:
+                save_single_frame(
+                    frame,
+                    timestep,
+                    odir=odir,
+                    frame_pattern=self.frame_pattern,
+                    dpi=self.dpi,
+                    close=False,
+                    compress_level=self.compress_level,
+                )
+
+    def _try_save_frames(
+        self,
+        odir,
+        timesteps,
+        manifest=None,
+        raise_errors=True,
+        profile=None,
+        data=None,
+        writers=0,
+        callback=None,
+    ):
+        """Save the frames for `timesteps` and return the failed frames and the last error"""
+        failed, error = [], None
+        current = []
+        # frames in a frame store are not cached as files
+        frame_cache = None if isinstance(odir, FrameStore) else self.frame_cache
+
+        def _track(timesteps):
+            for timestep in timesteps:
+                if frame_cache is not None:
+                    with _stage(profile, "cache", timestep):
+                        cached = frame_cache.get(
+                            self._frame_key(timestep), self._frame_path(odir, timestep)
+                        )
+                    if cached:
+                        if manifest is not None:
+                            manifest.record(timestep)
+                        if callback is not None:
+                            callback([timestep])
+                        continue
+                current.append(timestep)
+                yield timestep
+
+        remaining = _track(timesteps)
+        while True:
+            current.clear()
+            frames = self._iter_frames(remaining, profile=profile, data=data)
+            saved = set()
+
+            def _saved(timesteps):
+                for timestep in timesteps:
+                    if frame_cache is not None:
+                        with _stage(profile, "cache", timestep):
+                            frame_cache.put(self._frame_key(timestep), self._frame_path(odir, timestep))
+                    if manifest is not None:
+                        manifest.record(timestep)
+                    saved.add(timestep)
+                if callback is not None and timesteps:
+                    callback(timesteps)
+
+            writer = _FrameWriter(writers)
+            try:
+                with writer:
+                    for timestep, frame in frames:
+                        if writers and not isinstance(frame, np.ndarray):
+                            # the figure is reused for the next frame, so only its picture is written
+                            with _stage(profile, "draw", timestep):
+                                frame = _frame_picture(frame, dpi=self.dpi)
+                        _saved(writer.submit(timestep, self._save_frame, frame, odir, timestep, profile))
+                    _saved(writer.wait())
+                return failed, error
+            except Exception as e:
+                if raise_errors:
+                    raise
+                frames.close()
+                error = e
+                if not current:
+                    # the figure could not even be set up
+                    return failed + list(remaining), error
+                # continue (with a fresh figure) after the failed frame(s), frames
+                # rendered in batches fail together
+                failed.extend(timestep for timestep in current if timestep not in saved)
+
+    def save_frames_stream(
+        self,
+        mpath,
+        framerate=15,
+        ffmpeg_options="-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p",
+        progress=False,
+        verbose=False,
+        profile=None,
+        prefetch=0,
+        prefetch_depth=2,
+        gif_framerate=10,
+        gif_resolution=[480, 320],
+        gif_palette=False,
+    ):
+        """Encode movie frames directly, without writing picture files.
+
+        The rendered canvas of each frame is piped as raw RGBA video into a
+        single ffmpeg process.
+
+        Parameters
+        ----------
+        mpath : path
+            Path to the output movie file. ``.gif`` files are encoded as gif.
+        framerate : int
+            Frames per second for the output movie file.
+        ffmpeg_options : str
+            Encoding options to pass to ffmpeg call, or the name of a profile
+            (see :meth:`Movie.save`).
+        progress : bool, callable or SaveProgress
+            Show progress bar (requires tqdm), or call this with the
+            :class:`SaveProgress` whenever a frame is piped into ffmpeg.
+        verbose : bool
+            Show output of the ffmpeg process.
+        profile : SaveProfile, optional
+            Record the time spent in each stage of saving the frames.
+        prefetch : int
+            Load the data of this many frames at once on a background thread while
+            the previous frames are rendered. Only applies to dask-backed data.
+            Default: load each frame when it is plotted.
+        prefetch_depth : int
+            Maximum number of batches of `prefetch` frames loaded ahead.
+        gif_framerate : int
+            Frames per second of a gif.
+        gif_resolution : list
+            Width and height of a gif in pixels.
+        gif_palette : bool or path
+            Use a gif color palette, made from a sample of the frames. These frames are
+            rendered in advance, unless a directory with palettes of earlier runs
+            is given (see :meth:`save`).
+        """
+        ffmpeg_options = _ffmpeg_options(ffmpeg_options)
+        isgif = mpath.endswith(".gif")
+        palette = (
+            self._gif_palette(mpath, gif_palette, verbose=verbose) if isgif and gif_palette else None
+        )
+        progress = _save_progress(progress, len(self._frame_range()))
+        prefetcher = _FramePrefetcher(
+            self.data,
+            self.framedim,
+            self._frame_range(),
+            prefetch,
+            depth=prefetch_depth,
+            profile=profile,
+        )
+        try:
+            frames = self._iter_frames(self._frame_range(), profile=profile, data=prefetcher.data)
+            self._stream_frames(
+                mpath,
+                frames,
+                framerate=framerate,
+                ffmpeg_options=ffmpeg_options,
+                verbose=verbose,
+                profile=profile,
+                progress=progress,
+                gif_framerate=gif_framerate,
+                gif_resolution=gif_resolution,
+                palette=palette,
+            )
+        finally:
+            prefetcher.close()
+            if progress is not None:
+                progress.close()
+            if palette is not None and gif_palette is True:
+                os.remove(palette)
+
+    def _stream_frames(
+        self,
+        mpath,
+        frames,
+        framerate=15,
+        ffmpeg_options="-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p",
+        verbose=False,
+        profile=None,
+        progress=None,
+        gif_framerate=10,
+        gif_resolution=[480, 320],
+        palette=None,
+    ):
+        """Pipe the ``(timestep, frame)`` of `frames` into a single ffmpeg process.
 
-    def save_frames_parallel(self, odir, parallel_compute_kwargs=dict()):
+        The frames are figures, RGBA pictures or PNG files (as bytes).
         """
-        Saves all frames in parallel using dask.map_blocks.
+        isgif = mpath.endswith(".gif")
+        stream = None
+        frame_size = None
+        try:
+            for timestep, frame in frames:
+                if isinstance(frame, bytes):
+                    # encoded already, ffmpeg reads the size from the file
+                    buffer = frame
+                    size = None
+                elif isinstance(frame, np.ndarray):
+                    # already rendered as a picture
+                    buffer = frame
+                    size = frame.shape[1::-1]
+                else:
+                    with _stage(profile, "draw", timestep):
+                        buffer = _frame_buffer(frame, dpi=self.dpi)
+                    size = frame.canvas.get_width_height()
+                if stream is None:
+                    # the canvas decides the final pixel size, so start ffmpeg on the first frame
+                    frame_size = size
+                    inputs = (
+                        _png_pipe_input(framerate)
+                        if frame_size is None
+                        else _rawvideo_input(frame_size, framerate)
+                    )
+                    if isgif:
+                        command = _gif_ffmpeg_command(
+                            inputs,
+                            mpath,
+                            gif_framerate,
+                            gif_resolution,
+                            palette=palette,
+                        )
+                    else:
+                        command = _stream_ffmpeg_command(
+                            mpath, framerate, frame_size, ffmpeg_options, inputs=inputs
+                        )
+                    stream = _FFmpegStream(command, verbose=verbose)
+                elif size != frame_size:
+                    raise RuntimeError(
+                        "Frame %i has a size of %s pixels, but previous frames were %s."
+                        % (timestep, size, frame_size)
+                    )
+                with _stage(profile, "write", timestep):
+                    stream.write(buffer)
+                if progress is not None:
+                    progress.update([timestep])
+            if stream is not None:
+                with _stage(profile, "ffmpeg"):
+                    stream.close()
+        except BaseException:
+            if stream is not None:
+                stream.abort()
+                if os.path.exists(mpath):
+                    os.remove(mpath)
+            raise
+
+    def save_frames_parallel(
+        self,
+        odir,
+        parallel_compute_kwargs=dict(),
+        resume=False,
+        retries=0,
+        profile=None,
+        writers=0,
+        progress=False,
+    ):
+        """
+        Saves all frames in parallel with dask.
+
+        Each chunk of the data along :attr:`.framedim` is rendered by a single task,
+        so the data can be kept in its native chunking. The task loads its chunk
+        once and renders all of its frames from memory.
 
         Parameters
         ----------
-        odir : path
-            Path to the output directory.
+        odir : path or FrameStore
+            Path to the output directory, or the frame store the frames are written into.
         parallel_compute_kwargs : dict
             Keyword arguments to pass to Dask's :meth:`~dask.array.Array.compute`.
+        resume : bool
+            Record saved frames in a manifest in `odir` and skip frames that were
+            already saved there with the same settings.
+        retries : int
+            Number of times failed frames are rendered again before giving up.
+        profile : SaveProfile, optional
+            Record the time spent in each stage of saving the frames.
+        writers : int
+            Number of threads per task/process that encode and write the picture
+            files, while the next frames are rendered.
+        progress : bool, callable or SaveProgress
+            Show progress bar (requires tqdm), or call this with the
+            :class:`SaveProgress` whenever a chunk of frames is saved. With dask's
+            local schedulers chunks are reported as soon as they are saved,
+            otherwise (e.g. with dask.distributed) once all of them are saved.
         """
+        import dask
+        from dask.callbacks import Callback
+
         da = self.data
         framedim = self.framedim
 
-        # Ensure that `da` has single chunks along `framedim`. Otherwise this might result in unexpected output.
         if da.chunks is None:
             raise ValueError(
-                f"Input data needs to be a dask array to save in parallel. Please chunk the input with single chunks along {framedim}."
+                f"Input data needs to be a dask array to save in parallel. Please chunk the input along {framedim}."
             )
 
         if type(da) is xr.DataArray:
@@ -399,30 +2510,265 @@ class Movie:
         else:
             raise TypeError("`da` must be either an xarray.DataArray or xarray.Dataset")
 
-        if not all([chunk == 1 for chunk in framedim_chunks]):
-            raise ValueError(
-                f"Input data needs to be a with single chunks along {framedim}. Got these chunks instead ({framedim_chunks})"
+        manifest, pending = self._pending_frames(odir, resume)
+        progress = _save_progress(progress, len(pending))
+        pending = set(pending)
+        variables = _frame_variables(da, framedim)
+
+        def _save_frames_parallel(chunk, arrays):
+            # `arrays` are the blocks of the chunk, loaded by dask before the task runs
+            timesteps = [i for i in chunk if i in pending]
+            data = _with_loaded_frames(da, _LoadedFrames(framedim, variables, chunk, arrays))
+            # the tasks may run in other processes, so their records are returned
+            chunk_profile = None if profile is None else SaveProfile()
+            self._save_frames(
+                odir,
+                timesteps,
+                manifest=manifest,
+                retries=retries,
+                profile=chunk_profile,
+                data=data,
+                writers=writers,
             )
+            records = [] if chunk_profile is None else chunk_profile.records
+            return _worker_name(), timesteps, records
+
+        # One task per chunk along `framedim`, which depends on the blocks of that chunk
+        # of every variable, so that each block is only read once.
+        tasks = []
+        start = 0
+        for size in framedim_chunks:
+            chunk = range(start, start + size)
+            start += size
+            if not pending.intersection(chunk):
+                continue
+            arrays = {}
+            for name, var in variables.items():
+                index = [slice(None)] * var.ndim
+                index[var.dims.index(framedim)] = slice(chunk.start, chunk.stop)
+                arrays[name] = var.data[tuple(index)]
+            tasks.append(dask.delayed(_save_frames_parallel)(chunk, arrays))
+        keys = {task.key for task in tasks}
+        reported = set()
+
+        def _chunk_saved(key, result, dsk, state, id):
+            # only called by the local schedulers
+            if key in keys:
+                reported.add(key)
+                progress.update(result[1], worker=result[0])
 
-        total_time = da[framedim]
+        try:
+            with Callback(posttask=_chunk_saved) if progress is not None else contextlib.nullcontext():
+                results = dask.compute(*tasks, **parallel_compute_kwargs)
+            for task, (worker, timesteps, records) in zip(tasks, results):
+                if progress is not None and task.key not in reported:
+                    progress.update(timesteps, worker=worker)
+                if profile is not None:
+                    profile.extend(records)
+        finally:
+            if progress is not None:
+                progress.close()
+
+    def save_frames_processes(
+        self,
+        odir,
+        max_workers=None,
+        resume=False,
+        retries=0,
+        profile=None,
+        writers=0,
+        callback=None,
+        progress=False,
+    ):
+        """
+        Saves all frames in parallel using a pool of processes.
 
-        def _save_single_frame_parallel(xr_array, framedim):
-            time_of_chunk = xr_array[framedim]
-            timestep = (
-                abs(total_time - time_of_chunk[0]).argmin().item()
-            )  # get index of chunk in framedim
+        The frames are split into one contiguous batch per worker, and each
+        worker renders its batch with a single figure. Unlike
+        :meth:`save_frames_parallel` this does not require dask. The workers are
+        spawned, so `plotfunc` has to be importable (e.g. defined in a module).
 
-            fig, ax, pp = self.render_single_frame(timestep)
-            save_single_frame(fig, timestep, odir=odir, frame_pattern=self.frame_pattern, dpi=self.dpi)
+        Parameters
+        ----------
+        odir : path or FrameStore
+            Path to the output directory, or the frame store the frames are written into.
+        max_workers : int, optional
+            Number of worker processes. Defaults to the number of CPUs.
+        resume : bool
+            Record saved frames in a manifest in `odir` and skip frames that were
+            already saved there with the same settings.
+        retries : int
+            Number of times failed frames are rendered again before giving up.
+        profile : SaveProfile, optional
+            Record the time spent in each stage of saving the frames.
+        writers : int
+            Number of threads per task/process that encode and write the picture
+            files, while the next frames are rendered.
+        callback : callable, optional
+            Called with the frames of a worker's batch when the batch is saved.
+        progress : bool, callable or SaveProgress
+            Show progress bar (requires tqdm), or call this with the
+            :class:`SaveProgress` whenever a worker saved frames.
+        """
+        manifest, pending = self._pending_frames(odir, resume)
+        n_frames = len(pending)
+        if not n_frames:
+            return
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        batches = np.array_split(np.asarray(pending), min(max_workers, n_frames))
+        batches = [batch.tolist() for batch in batches if len(batch)]
+
+        # Forking after dask has started its thread pool can deadlock the workers,
+        # so the workers are started fresh and receive the movie once.
+        context = multiprocessing.get_context("spawn")
+        progress = _save_progress(progress, n_frames)
+        progress_queue = None
+        if progress is not None:
+            # the workers put the frames they saved into a queue, which is read here
+            progress_queue = context.Queue()
+            progress_thread = threading.Thread(
+                target=_read_progress, args=(progress_queue, progress), daemon=True
+            )
+            progress_thread.start()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=len(batches),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self, progress_queue),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _save_frames_worker, odir, batch, manifest, retries, profile is not None, writers
+                    )
+                    for batch in batches
+                ]
+                if callback is not None:
+
+                    def _batch_saved(future, batch):
+                        if not future.cancelled() and future.exception() is None:
+                            callback(batch)
+
+                    for future, batch in zip(futures, batches):
+                        future.add_done_callback(lambda future, batch=batch: _batch_saved(future, batch))
+                done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done:
+                    future.cancel()
+                # raise the first error (if any) in the order of the frames
+                for future in futures:
+                    if future in done:
+                        records = future.result()
+                        if profile is not None:
+                            profile.extend(records)
+        finally:
+            if progress is not None:
+                # the workers have exited, so everything they reported is queued before this
+                progress_queue.put(None)
+                progress_thread.join()
+                progress.close()
+
+    def save_frames_distributed(
+        self,
+        mpath,
+        client=None,
+        framerate=15,
+        ffmpeg_options="-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p",
+        progress=False,
+        verbose=False,
+        profile=None,
+        batch_size=1,
+        compress=True,
+        max_pending=None,
+        gif_framerate=10,
+        gif_resolution=[480, 320],
+        gif_palette=False,
+    ):
+        """Render the frames on a dask.distributed cluster and encode them on the client.
 
-            return time_of_chunk
+        The workers return the rendered frames instead of writing picture files, and
+        the client pipes them in order into a single ffmpeg process (like
+        :meth:`save_frames_stream`), so the workers do not need a filesystem shared
+        with the client. The movie is sent to every worker once (with a worker
+        plugin), and each worker thread keeps its figure between frames.
+        Requires the ``distributed`` package.
 
-        da.map_blocks(
-            func=_save_single_frame_parallel,
-            args=(framedim,),
-            template=xr.ones_like(da[framedim]).chunk({framedim: 1}),
-        ).compute(**parallel_compute_kwargs)
-        return
+        Parameters
+        ----------
+        mpath : path
+            Path to the output movie file. ``.gif`` files are encoded as gif.
+        client : distributed.Client, optional
+            Client of the cluster. Defaults to the current client.
+        framerate : int
+            Frames per second for the output movie file.
+        ffmpeg_options : str
+            Encoding options to pass to ffmpeg call, or the name of a profile
+            (see :meth:`Movie.save`).
+        progress : bool, callable or SaveProgress
+            Show progress bar (requires tqdm), or call this with the
+            :class:`SaveProgress` whenever a batch of frames is rendered.
+        verbose : bool
+            Show output of the ffmpeg process.
+        profile : SaveProfile, optional
+            Record the time spent piping the frames into ffmpeg.
+        batch_size : int
+            Number of frames rendered by each task.
+        compress : bool
+            Send the frames as PNG files (with :attr:`compress_level`) instead of raw
+            RGBA pictures, which are about 4 bytes per pixel.
+        max_pending : int, optional
+            Maximum number of batches rendered ahead of the next frame to encode.
+            Defaults to twice the number of worker threads.
+        gif_framerate : int
+            Frames per second of a gif.
+        gif_resolution : list
+            Width and height of a gif in pixels.
+        gif_palette : bool or path
+            Use a gif color palette, made from a sample of the frames rendered
+            on the client (see :meth:`save`).
+        """
+        try:
+            from . import _distributed
+        except ImportError as e:
+            raise ImportError(
+                "Saving frames on a cluster requires `distributed`. Install with "
+                "`conda install -c conda-forge distributed`"
+            ) from e
+
+        ffmpeg_options = _ffmpeg_options(ffmpeg_options)
+        isgif = mpath.endswith(".gif")
+        palette = (
+            self._gif_palette(mpath, gif_palette, verbose=verbose) if isgif and gif_palette else None
+        )
+        progress = _save_progress(progress, len(self._frame_range()))
+        try:
+            frames = _distributed.iter_frames(
+                self,
+                self._frame_range(),
+                client=client,
+                batch_size=batch_size,
+                compress=compress,
+                max_pending=max_pending,
+                progress=progress,
+            )
+            self._stream_frames(
+                mpath,
+                frames,
+                framerate=framerate,
+                ffmpeg_options=ffmpeg_options,
+                verbose=verbose,
+                profile=profile,
+                gif_framerate=gif_framerate,
+                gif_resolution=gif_resolution,
+                palette=palette,
+            )
+        finally:
+            # cancels the frames that were not encoded
+            frames.close()
+            if progress is not None:
+                progress.close()
+            if palette is not None and gif_palette is True:
+                os.remove(palette)
 
     def save(
         self,
@@ -434,11 +2780,22 @@ class Movie:
         overwrite_existing=False,
         parallel=False,
         parallel_compute_kwargs=dict(),
+        executor=None,
+        max_workers=None,
         framerate=15,
         ffmpeg_options="-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p",
         gif_palette=False,
         gif_resolution_factor=0.5,
         gif_framerate=10,
+        intermediate="files",
+        resume=False,
+        retries=0,
+        profile=False,
+        prefetch=0,
+        writers=0,
+        segments=None,
+        wait=True,
+        client=None,
     ):
         """Save out animation from Movie object.
 
@@ -452,31 +2809,55 @@ class Movie:
             leave all picture files in folder).
         remove_movie : bool
             As `remove_frames` but for movie file. Only applies when filename
-            is given as `.gif` (the default is ``True``).
-        progress : bool
-            Experimental switch to show progress output. This will be refined
-            in future version and currently only works with ``parallel=False``
+            is given as `.gif` (the default is ``True``). If the movie is removed,
+            the gif is encoded directly from the frames instead of from the movie.
+        progress : bool or callable
+            Show a progress bar of the saved frames with their rate and the
+            estimated time left (requires tqdm). A callable is called with the
+            :class:`SaveProgress` (frames done, frames per second, ETA and the
+            frames of each worker) whenever frames are saved instead
             (the default value is ``False``).
         verbose : bool
             Experimental switch to show output of ffmpeg commands. Useful for
             debugging but can quickly flood your notebook
             (the default is ``False``).
         overwrite_existing : bool
-            Set to overwrite existing files with `filename`
-            (the default is ``False``).
+            Set to overwrite existing files with `filename` (and its frame store
+            with ``intermediate='store'``) (the default is ``False``).
         parallel : bool
             Whether or not to use Dask to save the frames in parallel.
         parallel_compute_kwargs : dict
             Keyword arguments to pass to Dask's :func:`~dask.compute`.
+        executor : {None, 'dask', 'processes', 'distributed'}
+            How frames are saved in parallel. ``'dask'`` is the same as ``parallel=True``.
+            ``'processes'`` renders contiguous batches of frames in a pool of processes
+            (see :meth:`save_frames_processes`) and also works for data that is not
+            backed by dask. ``'distributed'`` renders the frames on the workers of a
+            dask.distributed cluster, which send them back to be encoded here (see
+            :meth:`save_frames_distributed`). This requires ``intermediate='stream'``,
+            but no filesystem shared with the workers (the default is ``None``,
+            which uses `parallel`).
+        max_workers : int, optional
+            Number of processes used with ``executor='processes'``.
+            Defaults to the number of CPUs.
         framerate : int
             Frames per second for the output movie file. Only relevant for ``.mp4`` files.
             (The default is 15).
         ffmpeg_options: str
             Encoding options to pass to ffmpeg call.
             Defaults to: ``"-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p"``.
-        gif_palette : bool
+            Named profiles (see :data:`~xmovie.core.FFMPEG_PROFILES`) trade quality for
+            speed: ``"draft"`` (fast previews), ``"balanced"`` and ``"archive"`` (the
+            default settings). ``"auto"`` uses the fastest encoder available in the
+            installed ffmpeg (e.g. a hardware encoder) that reaches the quality of
+            ``"balanced"``, ``"auto:draft"`` or ``"auto:archive"`` that of the other
+            profiles.
+        gif_palette : bool or path
             Use a gif colorpalette to improve quality. Can lead to artifacts
-            in very contrasty situations (the default is ``False``).
+            in very contrasty situations (the default is ``False``). The palette
+            is made from a sample of the frames. If a directory is given, palettes
+            are kept there and reused for the same data and plot settings (only
+            for gifs encoded directly from the frames).
         gif_resolution_factor : float
             Factor used to reduce gif resolution compared to movie.
             Use 1.0 to put out the same resolutions for both products.
@@ -487,7 +2868,95 @@ class Movie:
         gif_framerate : int
             As `framerate` but for the gif output file. Only relevant to `.gif` files.
             (The default is 10).
+        intermediate : {'files', 'stream', 'store'}
+            How rendered frames are handed to ffmpeg. ``'files'`` writes a picture
+            file per frame into the output directory. ``'stream'`` pipes the raw
+            canvas of each frame straight into ffmpeg, so no frame files are written.
+            Streaming currently requires serial saving (``parallel=False``) or
+            ``executor='distributed'``. ``'store'`` writes all frames into a single :class:`FrameStore` file
+            next to the movie (``<movie>_frames.npy``), which is kept for encoding
+            again if `remove_frames` is ``False`` (the default is ``'files'``).
+        resume : bool
+            Keep a manifest of the saved frames next to them, and only render frames
+            that are missing or were saved with different settings by an earlier
+            (e.g. interrupted) call with ``resume=True``. The manifest is removed
+            together with the frames. Requires ``intermediate='files'``
+            (the default is ``False``).
+        retries : int
+            Number of times frames that fail to render are tried again before
+            giving up (the default is 0).
+        profile : bool
+            Record the time and memory spent in each stage of saving every frame
+            (also in parallel workers) and return them as a :class:`SaveProfile`
+            (the default is ``False``).
+        prefetch : int
+            Load the data of this many frames at once on a background thread while
+            the previous frames are rendered. Only applies to serial saving of
+            dask-backed data (the default is 0, which loads each frame when it is plotted).
+        writers : int
+            Number of threads (per worker) that encode and write the frame files,
+            so that rendering the next frames overlaps with it. The format of the
+            frames is set by :attr:`frame_pattern` (the default is 0, which writes
+            each frame right after rendering it).
+        segments : int, optional
+            Split the frames into this many contiguous segments, which are encoded
+            concurrently by separate ffmpeg processes and then concatenated into the
+            movie without encoding them again. With serial saving and
+            ``executor='processes'`` a segment is encoded as soon as all of its frames
+            are saved, while the remaining frames are rendered. Requires
+            ``intermediate='files'`` or ``'store'`` (the default is ``None``, which
+            encodes all frames with a single ffmpeg process).
+        wait : bool
+            Wait for ffmpeg to encode the movie. Otherwise return the
+            :class:`FFmpegProcess` encoding it in the background as soon as the frames
+            are saved, so that e.g. the next movie can be rendered meanwhile. The frames
+            are removed once the movie is encoded, so the next movie has to be saved
+            into another directory (or with ``intermediate='store'``). Requires
+            ``intermediate='files'`` or ``'store'``, no `segments` and no `profile`
+            (the default is ``True``).
+        client : distributed.Client, optional
+            Client of the cluster used with ``executor='distributed'``. Defaults to
+            the current client.
+
+        Returns
+        -------
+        SaveProfile, FFmpegProcess or None
+            The recorded timings if `profile` is set, the encoding ffmpeg process
+            if `wait` is ``False``.
         """
+        if intermediate not in ["files", "stream", "store"]:
+            raise ValueError(
+                "Given value for `intermediate` (%s) not supported. Currently support ['files', 'stream', 'store']"
+                % intermediate
+            )
+        if executor is None and parallel:
+            executor = "dask"
+        if executor not in [None, "dask", "processes", "distributed"]:
+            raise ValueError(
+                "Given value for `executor` (%s) not supported. Currently support [None, 'dask', 'processes', 'distributed']"
+                % executor
+            )
+        if intermediate == "stream" and executor not in [None, "distributed"]:
+            raise ValueError(
+                "Streaming frames into ffmpeg (`intermediate='stream'`) requires serial saving (`parallel=False`) "
+                "or `executor='distributed'`."
+            )
+        if executor == "distributed" and intermediate != "stream":
+            raise ValueError(
+                "Saving on a cluster (`executor='distributed'`) streams the frames into ffmpeg and "
+                "requires `intermediate='stream'`."
+            )
+        if intermediate == "stream" and segments:
+            raise ValueError(
+                "Encoding segments (`segments`) requires saving frames (`intermediate='files'` or `'store'`)."
+            )
+        if intermediate != "files" and resume:
+            raise ValueError("Resuming (`resume=True`) requires saving frames (`intermediate='files'`).")
+        if not wait and (intermediate == "stream" or segments or profile):
+            raise ValueError(
+                "Encoding in the background (`wait=False`) requires saving frames "
+                "(`intermediate='files'` or `'store'`) without `segments` and `profile`."
+            )
 
         # parse out directory and filename
         dirname = os.path.dirname(filename)
@@ -504,9 +2973,15 @@ class Movie:
             moviefile = filename
 
         mpath = os.path.join(dirname, moviefile)
+        # gifs are encoded straight from the frames, unless the movie is kept
+        direct_gif = isgif and remove_movie
+        if isgif and not direct_gif and not wait:
+            raise ValueError(
+                "Encoding in the background (`wait=False`) requires `remove_movie=True` for gifs."
+            )
 
         # check existing files
-        if os.path.exists(mpath):
+        if os.path.exists(mpath) and not direct_gif:
             if not overwrite_existing:
                 raise RuntimeError(
                     "File `%s` already exists. Set `overwrite_existing` to True to overwrite." % (mpath)
@@ -518,34 +2993,192 @@ class Movie:
                         "File `%s` already exists. Set `overwrite_existing` to True to overwrite."
                         % (gpath)
                     )
+        store_path = os.path.join(dirname, os.path.splitext(moviefile)[0] + "_frames.npy")
+        if intermediate == "store" and os.path.exists(store_path) and not overwrite_existing:
+            raise RuntimeError(
+                "File `%s` already exists. Set `overwrite_existing` to True to overwrite." % (store_path)
+            )
 
-        # print frames
-        if parallel:
-            self.save_frames_parallel(dirname, parallel_compute_kwargs=parallel_compute_kwargs)
+        profile = SaveProfile() if profile else None
+        ffmpeg_options = _ffmpeg_options(ffmpeg_options)
+
+        if intermediate == "stream" and executor == "distributed":
+            # render on the cluster and encode here
+            self.save_frames_distributed(
+                gpath if direct_gif else mpath,
+                client=client,
+                framerate=framerate,
+                ffmpeg_options=ffmpeg_options,
+                progress=progress,
+                verbose=verbose,
+                profile=profile,
+                gif_framerate=gif_framerate,
+                gif_palette=gif_palette,
+            )
+            print("%s created at %s" % (("GIF", giffile) if direct_gif else ("Movie", moviefile)))
+        elif intermediate == "stream":
+            # render and encode in one go
+            self.save_frames_stream(
+                gpath if direct_gif else mpath,
+                framerate=framerate,
+                ffmpeg_options=ffmpeg_options,
+                progress=progress,
+                verbose=verbose,
+                profile=profile,
+                prefetch=prefetch,
+                gif_framerate=gif_framerate,
+                gif_palette=gif_palette,
+            )
+            print("%s created at %s" % (("GIF", giffile) if direct_gif else ("Movie", moviefile)))
         else:
-            self.save_frames_serial(dirname, progress=progress)
-
-        # Create movie
-        combine_frames_into_movie(
-            dirname,
-            moviefile,
-            frame_pattern=self.frame_pattern,
-            remove_frames=remove_frames,
-            verbose=verbose,
-            framerate=framerate,
-            ffmpeg_options=ffmpeg_options,
-        )
+            if intermediate == "store":
+                frames = FrameStore.create(
+                    store_path, len(self.data[self.framedim]), *self._frame_size()
+                )
+            else:
+                frames = dirname
+            encoder = None
+            if segments and not direct_gif:
+                if intermediate == "store":
+                    encoder = frames._segment_encoder(
+                        mpath, framerate, ffmpeg_options, segments, verbose
+                    )
+                else:
+                    encoder = _SegmentEncoder(
+                        mpath,
+                        len(self.data[self.framedim]),
+                        segments,
+                        lambda segment_frames, segment: _combine_ffmpeg_command(
+                            dirname,
+                            os.path.basename(segment),
+                            framerate,
+                            self.frame_pattern,
+                            ffmpeg_options,
+                            frames=segment_frames,
+                        ),
+                        verbose=verbose,
+                    )
+            # segments are encoded as soon as their frames are saved
+            callback = None if encoder is None else encoder.done
+            try:
+                # print frames
+                if executor == "dask":
+                    self.save_frames_parallel(
+                        frames,
+                        parallel_compute_kwargs=parallel_compute_kwargs,
+                        resume=resume,
+                        retries=retries,
+                        profile=profile,
+                        writers=writers,
+                        progress=progress,
+                    )
+                elif executor == "processes":
+                    self.save_frames_processes(
+                        frames,
+                        max_workers=max_workers,
+                        resume=resume,
+                        retries=retries,
+                        profile=profile,
+                        writers=writers,
+                        callback=callback,
+                        progress=progress,
+                    )
+                else:
+                    self.save_frames_serial(
+                        frames,
+                        progress=progress,
+                        resume=resume,
+                        retries=retries,
+                        profile=profile,
+                        prefetch=prefetch,
+                        writers=writers,
+                        callback=callback,
+                    )
+            except BaseException:
+                if encoder is not None:
+                    encoder.abort()
+                if intermediate == "store":
+                    # a partially rendered store cannot be resumed (see `_pending_frames`)
+                    frames.remove()
+                raise
+
+            # Create movie
+            p = None
+            if direct_gif:
+                if intermediate == "store":
+                    inputs = frames._input(framerate)
+                else:
+                    inputs = '-r %i -i "%s"' % (framerate, os.path.join(dirname, self.frame_pattern))
+                with _stage(profile, "gif"):
+                    p = self._encode_gif(
+                        inputs,
+                        gpath,
+                        gif_framerate,
+                        [480, 320],
+                        gif_palette,
+                        frames,
+                        verbose=verbose,
+                        wait=wait,
+                    )
+            elif encoder is not None:
+                with _stage(profile, "ffmpeg"):
+                    encoder.close()
+                print("Movie created at %s" % (moviefile))
+            elif intermediate == "store":
+                with _stage(profile, "ffmpeg"):
+                    p = frames.encode(
+                        mpath,
+                        framerate=framerate,
+                        ffmpeg_options=ffmpeg_options,
+                        verbose=verbose,
+                        wait=wait,
+                    )
+            else:
+                with _stage(profile, "ffmpeg"):
+                    p = combine_frames_into_movie(
+                        dirname,
+                        moviefile,
+                        frame_pattern=self.frame_pattern,
+                        remove_frames=remove_frames,
+                        verbose=verbose,
+                        framerate=framerate,
+                        ffmpeg_options=ffmpeg_options,
+                        wait=wait,
+                    )
+
+            def _finish(p=None):
+                # runs once the movie is encoded
+                if p is not None and p.returncode != 0:
+                    return
+                if intermediate == "store" and not direct_gif:
+                    print("Movie created at %s" % (moviefile))
+                if not remove_frames:
+                    return
+                if intermediate == "files" and (direct_gif or encoder is not None):
+                    _remove_frames(dirname, self.frame_pattern)
+                if intermediate == "store":
+                    frames.remove()
+                if resume:
+                    self._manifest(dirname).remove()
+
+            if wait:
+                _finish()
+            else:
+                p.add_done_callback(_finish)
+                return p
 
         # Create gif
-        if isgif:
+        if isgif and not direct_gif:
             # if ppath:
             #     create_gif_palette(mpath, ppath=ppath, verbose=verbose)
-            convert_gif(
-                mpath,
-                gpath=gpath,
-                resolution=[480, 320],
-                gif_palette=gif_palette,
-                verbose=verbose,
-                remove_movie=remove_movie,
-                gif_framerate=gif_framerate,
-            )
+            with _stage(profile, "gif"):
+                convert_gif(
+                    mpath,
+                    gpath=gpath,
+                    resolution=[480, 320],
+                    gif_palette=gif_palette,
+                    verbose=verbose,
+                    remove_movie=remove_movie,
+                    gif_framerate=gif_framerate,
+                )
+        return profile
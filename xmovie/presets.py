@@ -1,13 +1,16 @@
+import functools
+import sys
 import warnings
 
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
+import matplotlib as mpl
+import matplotlib.collections as mcollections
+import matplotlib.image as mimage
 import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
 import numpy as np
-import shapely.geometry as sgeom
 import xarray as xr
-from cartopy.mpl import geoaxes
+
+# cartopy and shapely are slow to import, so they are only imported by the
+# geographic presets (e.g. `rotating_globe`) once they are used
 
 
 def _check_input(da, fieldname):
@@ -68,6 +71,55 @@ def _base_plot(ax, base_data, timestamp, framedim, plotmethod=None, **kwargs):
     return p
 
 
+def _plot_dims(data, x=None, y=None):
+    """Dimension order (y, x) in which xarray hands 2D data to matplotlib"""
+    if x is None and y is None:
+        return data.dims
+    if x is None:
+        x = [d for d in data.dims if d not in data[y].dims][0]
+    if y is None:
+        y = [d for d in data.dims if d not in data[x].dims][0]
+    if data[x].ndim > 1 or data[y].ndim > 1:
+        return data.dims
+    return (data[y].dims[0], data[x].dims[0])
+
+
+def _remove_artist(pp):
+    if isinstance(pp, list):
+        for p in pp:
+            p.remove()
+    elif hasattr(pp, "collections") and not hasattr(pp, "get_paths"):
+        # ContourSet on matplotlib<3.8 is not an artist itself
+        for c in pp.collections:
+            c.remove()
+    else:
+        pp.remove()
+
+
+def _update_plot(ax, pp, data, plotmethod=None, **kwargs):
+    """Update plot primitive `pp` (created by `_core_plot`) with new `data`.
+
+    Images and meshes are updated in place, everything else (e.g. contours)
+    is removed and drawn again without a new colorbar.
+    """
+    if data.ndim == 2 and isinstance(pp, (mcollections.QuadMesh, mimage.AxesImage)):
+        dims = _plot_dims(data, x=kwargs.get("x"), y=kwargs.get("y"))
+        values = data.transpose(*dims).to_masked_array(copy=False)
+        if isinstance(pp, mimage.AxesImage):
+            pp.set_data(values)
+        else:
+            pp.set_array(values)
+        if kwargs.get("add_labels", True):
+            # only the text changes (`set_title` would also reset the other titles)
+            ax.title.set_text(data._title_for_slice())
+        return pp
+
+    _remove_artist(pp)
+    kwargs = {k: v for k, v in kwargs.items() if k not in ["cbar_kwargs", "cbar_ax"]}
+    kwargs["add_colorbar"] = False
+    return _core_plot(ax, data, plotmethod=plotmethod, **kwargs)
+
+
 # projections utilities and hacks
 def _smooth_boundary_NearsidePerspective(projection):
     # workaround for a smoother outer boundary
@@ -84,6 +136,9 @@ def _smooth_boundary_NearsidePerspective(projection):
     false_easting = projection.proj4_params["x_0"]
     false_northing = projection.proj4_params["y_0"]
     max_x = a * np.sqrt(h / (2 * a + h))
+    import cartopy.crs as ccrs
+    import shapely.geometry as sgeom
+
     coords = ccrs._ellipse_boundary(max_x, max_x, false_easting, false_northing, n=361)
     projection._boundary = sgeom.LinearRing(coords.T)
     return projection
@@ -132,11 +187,17 @@ def _style_dict(style=None):
     return style_dict[style]
 
 
+def _is_geoaxes(ax):
+    # cartopy axes can only exist once cartopy was imported
+    geoaxes = sys.modules.get("cartopy.mpl.geoaxes")
+    return geoaxes is not None and isinstance(ax, geoaxes.GeoAxesSubplot)
+
+
 def _set_style(fig, ax, pp, style):
     "Sets the colorscheme for figure, axis and plot object (`pp`) according to style"
     # check if ax is 'normal' or cartopy projection
     is_geoax = False
-    if isinstance(ax, geoaxes.GeoAxesSubplot):
+    if _is_geoaxes(ax):
         is_geoax = True
 
     # parse styles
@@ -186,28 +247,69 @@ def _set_style(fig, ax, pp, style):
         plt.setp(plt.getp(cb.ax.axes, "yticklabels"), color=fgcolor)
 
 
+@functools.lru_cache(maxsize=None)
+def _natural_earth_feature(name, **kwargs):
+    # Cartopy caches the geometries of a feature projected onto each projection,
+    # so together with `_globe_projection` a repeated view does not project them again.
+    import cartopy.feature as cfeature
+
+    return cfeature.NaturalEarthFeature(name=name, category="physical", scale="50m", **kwargs)
+
+
 def _add_land(ax, style):
-    if not isinstance(ax, geoaxes.GeoAxesSubplot):
+    if not _is_geoaxes(ax):
         raise ValueError("Cannot add land on non-cartopy axes. Got ($s)" % type(ax))
     style_dict = _style_dict(style)
-    feature = cfeature.NaturalEarthFeature(
-        name="land", category="physical", scale="50m", facecolor=style_dict["landcolor"]
-    )
-    ax.add_feature(feature)
+    ax.add_feature(_natural_earth_feature("land", facecolor=style_dict["landcolor"]))
 
 
 def _add_coast(ax, style):
-    if not isinstance(ax, geoaxes.GeoAxesSubplot):
+    if not _is_geoaxes(ax):
         raise ValueError("Cannot add land on non-cartopy axes. Got ($s)" % type(ax))
     style_dict = _style_dict(style)
-    feature = cfeature.NaturalEarthFeature(
-        name="coastline",
-        category="physical",
-        scale="50m",
-        edgecolor=style_dict["coastcolor"],
-        facecolor="none",
+    ax.add_feature(
+        _natural_earth_feature("coastline", edgecolor=style_dict["coastcolor"], facecolor="none")
     )
-    ax.add_feature(feature)
+
+
+@functools.lru_cache(maxsize=256)
+def _gridline_segments(projection, n_steps=500):
+    """Meridians and parallels (every 30 degrees) projected onto `projection`.
+
+    These are the lines :meth:`~cartopy.mpl.geoaxes.GeoAxes.gridlines` draws on a
+    global map, but they are only projected once per view instead of on every draw.
+    """
+    import cartopy.crs as ccrs
+
+    lines = []
+    for lon in range(-180, 181, 30):
+        lines.append(np.stack([np.full(n_steps, lon), np.linspace(-90, 90, n_steps)], axis=-1))
+    for lat in range(-90, 91, 30):
+        lines.append(np.stack([np.linspace(-180, 180, n_steps), np.full(n_steps, lat)], axis=-1))
+    lines = np.stack(lines)
+    points = projection.transform_points(ccrs.PlateCarree(), lines[..., 0], lines[..., 1])[..., :2]
+    # Points on the far side of the globe are not finite. Split the lines there, which
+    # is much faster than clipping them with `project_geometry` (at a resolution of `n_steps`).
+    visible = np.isfinite(points).all(axis=-1)
+    segments = []
+    for line, line_visible in zip(points, visible):
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], line_visible, [0]])))
+        segments.extend(line[start:stop] for start, stop in zip(edges[::2], edges[1::2]))
+    return [segment for segment in segments if len(segment) > 1]
+
+
+def _add_gridlines(ax):
+    lines = mcollections.LineCollection(
+        _gridline_segments(ax.projection),
+        transform=ax.transData,
+        color=mpl.rcParams["grid.color"],
+        linestyle=mpl.rcParams["grid.linestyle"],
+        linewidth=mpl.rcParams["grid.linewidth"],
+        clip_path=ax.patch,
+        zorder=2,
+    )
+    ax.add_collection(lines, autolim=False)
+    return lines
 
 
 # Presets (should proabably put all others into a submodule)
@@ -225,6 +327,407 @@ def basic(
     return ax, pp
 
 
+def _fixed_color_limits(plotmethod, kwargs):
+    """Check if the color scaling is the same for every frame, so that existing
+    artists (and their colorbar) can be updated in place"""
+    if plotmethod in ["contour", "contourf"]:
+        # contour levels are picked from the data of each frame
+        return False
+    # xarray picks `extend` for the colorbar from the data of each frame
+    return (
+        "vmin" in kwargs
+        and "vmax" in kwargs
+        and ("extend" in kwargs or kwargs.get("add_colorbar") is False)
+        and not kwargs.get("robust", False)
+        and "levels" not in kwargs
+    )
+
+
+def _set_animated(ax, pp):
+    """Mark the artists that are updated in place for every frame, so that the rest of
+    the figure can be drawn once (see ``Movie(..., blit=True)``)"""
+    for artist in pp if isinstance(pp, list) else [pp]:
+        artist.set_animated(True)
+    ax.title.set_animated(True)
+
+
+def _basic_setup(
+    fig, da, framedim="time", plotmethod=None, plot_variable=None, subplot_kw=None, blit=False, **kwargs
+):
+    data = _check_input(da, plot_variable)
+    return dict(
+        fig=fig,
+        ax=None,
+        pp=None,
+        data=data,
+        framedim=framedim,
+        plotmethod=plotmethod,
+        subplot_kw=subplot_kw,
+        blit=blit,
+        kwargs=kwargs,
+    )
+
+
+def _basic_update(state, timestamp):
+    if state["pp"] is None or not _fixed_color_limits(state["plotmethod"], state["kwargs"]):
+        # Without fixed color limits every frame gets its own color scaling
+        # (and colorbar), so the figure is drawn from scratch.
+        fig = state["fig"]
+        fig.clear()
+        state["ax"] = fig.subplots(subplot_kw=state["subplot_kw"])
+        state["pp"] = _base_plot(
+            state["ax"],
+            state["data"],
+            timestamp,
+            state["framedim"],
+            plotmethod=state["plotmethod"],
+            **state["kwargs"],
+        )
+    else:
+        data = state["data"].isel({state["framedim"]: timestamp})
+        state["pp"] = _update_plot(
+            state["ax"], state["pp"], data, plotmethod=state["plotmethod"], **state["kwargs"]
+        )
+        if state["blit"]:
+            _set_animated(state["ax"], state["pp"])
+    return state["ax"], state["pp"]
+
+
+basic.setup = _basic_setup
+basic.update = _basic_update
+
+
+def raster(da, fig, timestamp, framedim="time", **kwargs):
+    """Fast heatmap of 2D frames.
+
+    The figure looks like :func:`basic` with ``plotmethod="imshow"`` (without the
+    frame in the title). When saving a :class:`~xmovie.Movie`, the axes, colorbar and
+    labels are only drawn once by matplotlib, and the frames are colored with a lookup
+    table and pasted into that picture in batches of `batch_size` frames. The color
+    limits (`vmin`/`vmax`, which :class:`~xmovie.Movie` sets by default) and the norm
+    are taken from the first frame.
+    """
+    state = _raster_setup(fig, da, framedim, **kwargs)
+    return _raster_update(state, timestamp)
+
+
+def _raster_setup(
+    fig, da, framedim="time", plot_variable=None, subplot_kw=None, batch_size=16, **kwargs
+):
+    data = _check_input(da, plot_variable)
+    if data.ndim != 3:
+        raise ValueError("`raster` requires 2D frames. Got dimensions %s" % (data.dims,))
+    # every data point is a block of pixels, as in the pasted frames
+    kwargs.setdefault("interpolation", "nearest")
+    ax = fig.subplots(subplot_kw=subplot_kw)
+    pp = data.isel({framedim: 0}).plot.imshow(ax=ax, **kwargs)
+    ax.set_title("")
+    dims = _plot_dims(data.isel({framedim: 0}), x=kwargs.get("x"), y=kwargs.get("y"))
+    return dict(
+        fig=fig,
+        ax=ax,
+        pp=pp,
+        data=data,
+        framedim=framedim,
+        dims=dims,
+        batch_size=batch_size,
+        lookup=None,
+    )
+
+
+def _raster_update(state, timestamp):
+    data = state["data"].isel({state["framedim"]: timestamp})
+    state["pp"].set_data(data.transpose(*state["dims"]).to_masked_array(copy=False))
+    return state["ax"], state["pp"]
+
+
+def _pixel_index(pixels, start, stop, n):
+    """Index of the data point (out of `n` between `start` and `stop`) at each of `pixels`"""
+    return np.clip(np.floor((pixels - start) / (stop - start) * n), 0, n - 1).astype(np.intp)
+
+
+def _draw_image(fig, pp, color=None):
+    """RGBA picture of `fig`, with the image `pp` in a single `color` (or hidden)"""
+    values = pp.get_array()
+    if color is None:
+        pp.set_visible(False)
+    else:
+        # RGBA data bypasses the colormap, which the colorbar shares
+        pp.set_data(np.broadcast_to(mpl.colors.to_rgba(color), values.shape[:2] + (4,)))
+    try:
+        fig.canvas.draw()
+        return np.array(fig.canvas.buffer_rgba())
+    finally:
+        pp.set_visible(True)
+        pp.set_data(values)
+
+
+def _raster_lookup(state):
+    """Picture of the figure without the image, and where and how the frames are pasted into it"""
+    fig, ax, pp = state["fig"], state["ax"], state["pp"]
+    template = _draw_image(fig, pp)
+    # the image shows wherever its color matters (i.e. not below the spines)
+    mask = (_draw_image(fig, pp, "black") != _draw_image(fig, pp, "white")).any(axis=-1)
+    height, width = template.shape[:2]
+    rows, columns = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+    if not len(rows):
+        rows = columns = np.array([0, -1])
+    rows, columns = slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1)
+
+    # data coordinates of the pixel centers (rows of the picture go from the top)
+    x = np.arange(width)[columns] + 0.5
+    y = height - (np.arange(height)[rows] + 0.5)
+    to_data = ax.transData.inverted()
+    x = to_data.transform(np.stack([x, np.full(len(x), y[0] if len(y) else 0)], axis=-1))[:, 0]
+    y = to_data.transform(np.stack([np.full(len(y), x[0] if len(x) else 0), y], axis=-1))[:, 1]
+
+    ny, nx = pp.get_array().shape
+    left, right, bottom, top = pp.get_extent()
+    if pp.origin == "upper":
+        bottom, top = top, bottom
+
+    # colors as one uint32 per pixel: the colormap, then under, over and bad
+    cmap = pp.get_cmap()
+    colors = np.concatenate(
+        [
+            cmap(np.arange(cmap.N), bytes=True),
+            cmap(np.array([-1, cmap.N]), bytes=True),
+            cmap(np.ma.masked_all(1), bytes=True),
+        ]
+    )
+    return dict(
+        template=template,
+        mask=mask[rows, columns],
+        rows=rows,
+        columns=columns,
+        row_index=_pixel_index(y, bottom, top, ny),
+        column_index=_pixel_index(x, left, right, nx),
+        colors=np.ascontiguousarray(colors).view(np.uint32)[:, 0],
+        norm=pp.norm,
+        n_colors=cmap.N,
+    )
+
+
+def _raster_colors(lookup, values):
+    """Index into the colors of `lookup` for every value (like `Colormap.__call__`)"""
+    n = lookup["n_colors"]
+    normed = lookup["norm"](values)
+    normed, bad = np.ma.getdata(normed) * n, np.ma.getmaskarray(normed)
+    bad = bad | np.isnan(normed)
+    normed[bad] = 0
+    # the upper limit itself still gets the last color
+    normed[normed == n] = n - 1
+    index = np.clip(normed, 0, n - 1).astype(np.intp)
+    index[normed < 0] = n
+    index[normed >= n] = n + 1
+    index[bad] = n + 2
+    return index
+
+
+def _raster_render(state, timesteps):
+    """Render the frames for `timesteps` as RGBA pictures, yielding ``(timestep, picture)``"""
+    if state["lookup"] is None:
+        state["lookup"] = _raster_lookup(state)
+    lookup = state["lookup"]
+    template = lookup["template"].view(np.uint32)[..., 0]
+    rows, columns = lookup["rows"], lookup["columns"]
+    pixel_index = np.ix_(lookup["row_index"], lookup["column_index"])
+    timesteps = iter(timesteps)
+    while True:
+        batch = [t for _, t in zip(range(state["batch_size"]), timesteps)]
+        if not batch:
+            return
+        values = state["data"].isel({state["framedim"]: batch})
+        values = values.transpose(state["framedim"], *state["dims"]).to_masked_array(copy=False)
+        index = _raster_colors(lookup, values)
+        pictures = np.repeat(template[None], len(batch), axis=0)
+        for picture, frame_index in zip(pictures, index):
+            frame_index = frame_index[pixel_index]
+            region = picture[rows, columns]
+            # bad values are transparent and show the figure behind them
+            paste = lookup["mask"] & (frame_index != lookup["n_colors"] + 2)
+            np.copyto(region, lookup["colors"][frame_index], where=paste)
+        pictures = pictures.view(np.uint8).reshape(pictures.shape + (4,))
+        for timestep, picture in zip(batch, pictures):
+            yield timestep, picture
+
+
+raster.setup = _raster_setup
+raster.update = _raster_update
+raster.render = _raster_render
+
+
+def _globe_path(n_frames, lon_start, lon_rotations, lat_start, lat_rotations):
+    # rotate lon_rotations times throughout movie and start at lon_start
+    lon = np.linspace(0, 360 * lon_rotations, n_frames) + lon_start
+    # Same for lat
+    lat = np.linspace(0, 360 * lat_rotations, n_frames) + lat_start
+    return lon, lat
+
+
+@functools.lru_cache(maxsize=256)
+def _globe_projection(central_longitude, central_latitude):
+    # proj = ccrs.Orthographic(lon[timestamp], lat[timestamp])
+    # proj = _smooth_boundary_globe(proj)
+    # This looks more like a 3D globe in my opinion
+    import cartopy.crs as ccrs
+
+    proj = ccrs.NearsidePerspective(
+        central_longitude=central_longitude, central_latitude=central_latitude
+    )
+    return _smooth_boundary_NearsidePerspective(proj)
+
+
+def _globe_view(central_longitude, central_latitude):
+    """The view as hashable floats, with the longitude wrapped to [-180, 180) and both
+    rounded, so that e.g. the same view in every rotation of a looping movie is equal"""
+    lon = ((float(central_longitude) + 180) % 360) - 180
+    return round(lon, 6), round(float(central_latitude), 6)
+
+
+def _globe_axes(fig, central_longitude, central_latitude, position=None):
+    # the projection (and everything cached for it) is shared by all frames with the same view
+    proj = _globe_projection(*_globe_view(central_longitude, central_latitude))
+
+    # create axis (TODO:this should be handled by the basic preset )
+    if position is None:
+        return fig.subplots(subplot_kw=dict(projection=proj))
+    # replace an existing globe (e.g. next to a colorbar that is kept)
+    return fig.add_axes(position, projection=proj)
+
+
+def _globe_features(ax, land=False, gridlines=False, coastline=True, style=None):
+    ax.set_title("")
+    ax.set_global()
+
+    # set style (TODO: move this to the basic function including the set style)
+    if land:
+        _add_land(ax, style)
+
+    if coastline:
+        _add_coast(ax, style)
+
+    if gridlines:
+        # for now fixed locations, see `_gridline_segments`
+        gl = _add_gridlines(ax)
+    else:
+        gl = None
+    # i should output this to test the preset. Maybe a dict output for the pp and gl (and potentially others)?
+
+    # need a way to do that for the outline too
+
+    # possibly for future versions, but I need a way to increase results
+    # ax.outline_patch.set_visible(False)
+    return gl
+
+
+def _cell_index(centers, values, period=None):
+    """Index of the cell around `centers` that contains each of `values` (-1 if none).
+
+    The cell boundaries are halfway between the centers, as for `pcolormesh`.
+    """
+    order = np.argsort(centers)
+    centers = centers[order]
+    edges = np.concatenate(
+        [
+            [centers[0] - (centers[1] - centers[0]) / 2],
+            (centers[1:] + centers[:-1]) / 2,
+            [centers[-1] + (centers[-1] - centers[-2]) / 2],
+        ]
+    )
+    if period is not None:
+        values = edges[0] + np.mod(values - edges[0], period)
+    index = np.searchsorted(edges, values, side="right") - 1
+    if period is not None and edges[-1] - edges[0] >= period * (1 - 1e-6):
+        # the cells cover the full circle
+        index = np.minimum(index, len(centers) - 1)
+    valid = np.isfinite(values) & (index >= 0) & (index < len(centers))
+    return np.where(valid, order[np.clip(index, 0, len(centers) - 1)], -1)
+
+
+@functools.lru_cache(maxsize=16)
+def _regrid_index(projection, shape, lon, lat):
+    """Pixel grid of shape (ny, nx) spanning the globe in `projection`, and the
+    index of the source cell (into the flattened (lat, lon) data, -1 outside of the
+    data) for the center of each pixel. `lon` and `lat` are the cell centers."""
+    ny, nx = shape
+    x0, x1 = projection.x_limits
+    y0, y1 = projection.y_limits
+    x = x0 + (np.arange(nx) + 0.5) * (x1 - x0) / nx
+    y = y0 + (np.arange(ny) + 0.5) * (y1 - y0) / ny
+    xx, yy = np.meshgrid(x, y)
+    import cartopy.crs as ccrs
+
+    points = ccrs.PlateCarree().transform_points(projection, xx, yy)
+    lon_index = _cell_index(np.asarray(lon), points[..., 0], period=360)
+    lat_index = _cell_index(np.asarray(lat), points[..., 1])
+    index = np.where((lon_index >= 0) & (lat_index >= 0), lat_index * len(lon) + lon_index, -1)
+    return x, y, index.astype(np.int32)
+
+
+def _regrid_frame(ax, data, x=None, y=None):
+    """Resample the 2D lon/lat `data` onto the pixel grid of the globe `ax` (nearest cell)"""
+    ydim, xdim = _plot_dims(data, x=x, y=y)
+    lon = data[xdim if x is None else x]
+    lat = data[ydim if y is None else y]
+    if data.ndim != 2 or lon.ndim != 1 or lat.ndim != 1:
+        raise ValueError(
+            "`regrid` requires 2D data with 1D longitude and latitude coordinates. Got %s" % (data.dims,)
+        )
+    # As many pixels as the globe can span on the figure, independent of the axes
+    # layout, so that each view is only resampled once.
+    fig = ax.figure
+    n = max(int(round(min(fig.bbox.width, fig.bbox.height))), 1)
+    px, py, index = _regrid_index(
+        ax.projection, (n, n), tuple(lon.values.tolist()), tuple(lat.values.tolist())
+    )
+    values = data.transpose(lat.dims[0], lon.dims[0]).values
+    image = np.where(index >= 0, values.ravel()[index], np.nan)
+    scalar_coords = {k: v for k, v in data.coords.items() if v.ndim == 0}
+    return xr.DataArray(
+        image, coords=[("y", py), ("x", px)], name=data.name, attrs=data.attrs
+    ).assign_coords(scalar_coords)
+
+
+def _globe_base_plot(ax, data, timestamp, framedim, plotmethod=None, regrid=False, **kwargs):
+    if not regrid:
+        import cartopy.crs as ccrs
+
+        kwargs.update(transform=ccrs.PlateCarree())
+        return _base_plot(ax, data, timestamp, framedim, plotmethod=plotmethod, **kwargs)
+    if plotmethod not in [None, "pcolormesh", "imshow"]:
+        raise ValueError("`regrid` is not supported for plotmethod '%s'" % plotmethod)
+    image = _regrid_frame(
+        ax, data.isel({framedim: timestamp}), x=kwargs.pop("x", None), y=kwargs.pop("y", None)
+    )
+    # the image is already in the projection of the axes
+    return image.plot.imshow(ax=ax, transform=ax.projection, **kwargs)
+
+
+def _globe_plot(
+    fig,
+    data,
+    timestamp,
+    framedim,
+    central_longitude,
+    central_latitude,
+    plotmethod=None,
+    land=False,
+    gridlines=False,
+    coastline=True,
+    style=None,
+    position=None,
+    regrid=False,
+    **kwargs,
+):
+    ax = _globe_axes(fig, central_longitude, central_latitude, position=position)
+    pp = _globe_base_plot(ax, data, timestamp, framedim, plotmethod=plotmethod, regrid=regrid, **kwargs)
+
+    _set_style(fig, ax, pp, style=style)
+    _globe_features(ax, land=land, gridlines=gridlines, coastline=coastline, style=style)
+    return ax, pp
+
+
 def rotating_globe(
     da,
     fig,
@@ -241,8 +744,9 @@ def rotating_globe(
     gridlines=False,
     coastline=True,
     style=None,
+    regrid=False,
     debug=False,
-    **kwargs
+    **kwargs,
 ):
     """
     Rotating globe plot.
@@ -279,62 +783,137 @@ def rotating_globe(
     coastline : bool
         Plot the coastlines.
     style : {'standard', 'dark'}
+    regrid : bool
+        Resample the data onto the pixels of the globe (taking the nearest grid
+        cell) and draw it as an image, instead of projecting every grid cell.
+        This is much faster for high resolution data, and the resampling is
+        reused for frames with the same view. Requires 1D longitude and latitude
+        coordinates.
     debug : bool
         Currently unused.
     **kwargs
         Passed on to the xarray plotting method.
     """
-
-    # rotate lon_rotations times throughout movie and start at lon_start
-    lon = np.linspace(0, 360 * lon_rotations, len(da[framedim])) + lon_start
-    # Same for lat
-    lat = np.linspace(0, 360 * lat_rotations, len(da[framedim])) + lat_start
-
-    # proj = ccrs.Orthographic(lon[timestamp], lat[timestamp])
-    # proj = _smooth_boundary_globe(proj)
-    # This looks more like a 3D globe in my opinion
-    proj = ccrs.NearsidePerspective(central_longitude=lon[timestamp], central_latitude=lat[timestamp])
-    proj = _smooth_boundary_NearsidePerspective(proj)
-
-    subplot_kw = dict(projection=proj)
-
-    # mapping style kwargs
-    map_style_kwargs = dict(transform=ccrs.PlateCarree())
-    kwargs.update(map_style_kwargs)
-
-    # create axis (TODO:this should be handled by the basic preset )
-    ax = fig.subplots(subplot_kw=subplot_kw)
+    lon, lat = _globe_path(len(da[framedim]), lon_start, lon_rotations, lat_start, lat_rotations)
     data = _check_input(da, plot_variable)
-    pp = _base_plot(ax, data, timestamp, framedim, plotmethod=plotmethod, **kwargs)
-
-    _set_style(fig, ax, pp, style=style)
+    return _globe_plot(
+        fig,
+        data,
+        timestamp,
+        framedim,
+        lon[timestamp],
+        lat[timestamp],
+        plotmethod=plotmethod,
+        land=land,
+        gridlines=gridlines,
+        coastline=coastline,
+        style=style,
+        regrid=regrid,
+        **kwargs,
+    )
 
-    ax.set_title("")
-    ax.set_global()
 
-    # set style (TODO: move this to the basic function including the set style)
-    if land:
-        _add_land(ax, style)
+def _rotating_globe_setup(
+    fig,
+    da,
+    framedim="time",
+    plotmethod=None,
+    plot_variable=None,
+    overlay_variables=None,
+    lon_start=-110,
+    lon_rotations=0.5,
+    lat_start=25,
+    lat_rotations=0,
+    land=False,
+    gridlines=False,
+    coastline=True,
+    style=None,
+    regrid=False,
+    debug=False,
+    blit=False,
+    **kwargs,
+):
+    lon, lat = _globe_path(len(da[framedim]), lon_start, lon_rotations, lat_start, lat_rotations)
+    return dict(
+        fig=fig,
+        ax=None,
+        pp=None,
+        view=None,
+        lon=lon,
+        lat=lat,
+        data=_check_input(da, plot_variable),
+        framedim=framedim,
+        plotmethod=plotmethod,
+        style=style,
+        regrid=regrid,
+        blit=blit,
+        globe_kwargs=dict(land=land, gridlines=gridlines, coastline=coastline),
+        kwargs=kwargs,
+    )
 
-    if coastline:
-        _add_coast(ax, style)
 
-    if gridlines:
-        gl = ax.gridlines()
-        # Increase gridline res
-        gl.n_steps = 500
-        # for now fixed locations
-        gl.xlocator = mticker.FixedLocator(range(-180, 181, 30))
-        gl.ylocator = mticker.FixedLocator(range(-90, 91, 30))
+def _rotating_globe_update(state, timestamp):
+    fig = state["fig"]
+    view = _globe_view(state["lon"][timestamp], state["lat"][timestamp])
+    if state["pp"] is None or not _fixed_color_limits(state["plotmethod"], state["kwargs"]):
+        # draw everything from scratch (see `_basic_update`)
+        fig.clear()
+        state["ax"], state["pp"] = _globe_plot(
+            fig,
+            state["data"],
+            timestamp,
+            state["framedim"],
+            view[0],
+            view[1],
+            plotmethod=state["plotmethod"],
+            style=state["style"],
+            regrid=state["regrid"],
+            **state["globe_kwargs"],
+            **state["kwargs"],
+        )
+    elif view != state["view"]:
+        # The projection of an axes is fixed, so a new view needs a new globe.
+        # The colorbar (and the rest of the figure) is kept as is.
+        position = state["ax"].get_position(original=True)
+        anchor = state["ax"].get_anchor()
+        state["ax"].remove()
+        ax = _globe_axes(fig, view[0], view[1], position=position)
+        ax.set_anchor(anchor)
+        kwargs = {k: v for k, v in state["kwargs"].items() if k not in ["cbar_kwargs", "cbar_ax"]}
+        kwargs.update(add_colorbar=False)
+        pp = _globe_base_plot(
+            ax,
+            state["data"],
+            timestamp,
+            state["framedim"],
+            plotmethod=state["plotmethod"],
+            regrid=state["regrid"],
+            **kwargs,
+        )
+        _set_style(fig, ax, pp, style=state["style"])
+        _globe_features(ax, style=state["style"], **state["globe_kwargs"])
+        state["ax"], state["pp"] = ax, pp
     else:
-        gl = None
-    # i should output this to test the preset. Maybe a dict output for the pp and gl (and potentially others)?
+        import cartopy.crs as ccrs
+
+        data = state["data"].isel({state["framedim"]: timestamp})
+        kwargs = dict(state["kwargs"], transform=ccrs.PlateCarree())
+        if state["regrid"]:
+            data = _regrid_frame(state["ax"], data, x=kwargs.pop("x", None), y=kwargs.pop("y", None))
+            kwargs["transform"] = state["ax"].projection
+        state["pp"] = _update_plot(
+            state["ax"], state["pp"], data, plotmethod=state["plotmethod"], **kwargs
+        )
+        state["ax"].title.set_text("")
+        if state["blit"]:
+            # only while the view stays the same
+            _set_animated(state["ax"], state["pp"])
+    state["view"] = view
+    return state["ax"], state["pp"]
 
-    # need a way to do that for the outline too
 
-    # possibly for future versions, but I need a way to increase results
-    # ax.outline_patch.set_visible(False)
-    return ax, pp
+rotating_globe.setup = _rotating_globe_setup
+rotating_globe.update = _rotating_globe_update
 
 
 def rotating_globe_dark(da, fig, timestamp, **kwargs):
@@ -344,3 +923,16 @@ def rotating_globe_dark(da, fig, timestamp, **kwargs):
         DeprecationWarning,
     )
     return rotating_globe(da, fig, timestamp, style="dark", **kwargs)
+
+
+def _rotating_globe_dark_setup(fig, da, framedim="time", **kwargs):
+    warnings.warn(
+        "This preset will be deprecated in the future. \
+    Use `rotating_globe` with `style=`dark`` instead`",
+        DeprecationWarning,
+    )
+    return _rotating_globe_setup(fig, da, framedim, style="dark", **kwargs)
+
+
+rotating_globe_dark.setup = _rotating_globe_dark_setup
+rotating_globe_dark.update = _rotating_globe_update
@@ -1,4 +1,10 @@
+import json
 import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
 
 import cv2
 import dask.array as dsa
@@ -10,17 +16,34 @@ import xarray as xr
 from PIL import Image
 
 from xmovie.core import (
+    _AUTO_ENCODERS,
+    FFMPEG_PROFILES,
+    FFmpegProcess,
+    FrameStore,
     Movie,
+    SaveProfile,
+    SaveProgress,
     _check_ffmpeg_execute,
+    _check_ffmpeg_version,
     _check_plotfunc_output,
+    _color_limits,
     _combine_ffmpeg_command,
+    _decimate,
     _execute_command,
+    _ffmpeg_capabilities,
+    _ffmpeg_options,
+    _FrameCache,
+    _FramePrefetcher,
+    _FrameWriter,
+    _load_picture,
     _parse_plot_defaults,
+    _SegmentEncoder,
+    _stream_ffmpeg_command,
     combine_frames_into_movie,
     convert_gif,
     save_single_frame,
 )
-from xmovie.presets import basic, rotating_globe
+from xmovie.presets import basic, raster, rotating_globe
 
 
 def test_parse_plot_defaults():
@@ -45,6 +68,60 @@ def test_parse_plot_defaults():
         assert expected == "input"
 
 
+@pytest.mark.parametrize("chunked", [True, False])
+@pytest.mark.parametrize("robust", [True, False])
+def test_color_limits(tmpdir, chunked, robust):
+    da = xr.DataArray(np.random.rand(4, 5, 10), dims=["x", "y", "time"])
+    da[0, 0, 0] = np.nan
+    if chunked:
+        da = da.chunk({"time": 2})
+    vmin, vmax = _color_limits(da, robust=robust)
+    if robust:
+        assert vmin == np.nanpercentile(da.values, 2)
+        assert vmax == np.nanpercentile(da.values, 98)
+    else:
+        assert vmin == da.min().values
+        assert vmax == da.max().values
+
+    # cached results are reused for the same data
+    cache = tmpdir.join("cache")
+    assert _color_limits(da, robust=robust, cache_dir=cache.strpath) == (vmin, vmax)
+    (cache_file,) = cache.listdir()
+    cache_file.write('{"vmin": -1, "vmax": 2}')
+    assert _color_limits(da, robust=robust, cache_dir=cache.strpath) == (-1, 2)
+    # but not for different data
+    assert _color_limits(da + 1, robust=robust, cache_dir=cache.strpath) != (-1, 2)
+
+
+def test_color_limits_robust_blocks():
+    values = np.random.default_rng(0).normal(size=(100, 120, 8))
+    values[..., 0] = np.nan
+    da = xr.DataArray(values, dims=["x", "y", "time"]).chunk({"x": 50, "time": 1})
+    # blocks with more values than percentiles are only reduced to their percentiles
+    assert da.data.chunksize[0] * da.data.chunksize[1] > 1001
+    vmin, vmax = _color_limits(da, robust=True)
+    expected = np.nanpercentile(values, [2, 98])
+    np.testing.assert_allclose([vmin, vmax], expected, atol=0.01)
+
+
+def test_color_limits_sample():
+    da = xr.DataArray(np.arange(10.0), dims=["time"])
+    assert _color_limits(da, framedim="time", sample=2) == (0, 9)
+    da[-1] = 100
+    da[0] = -100
+    assert _color_limits(da, framedim="time", sample=3) == (-100, 100)
+    # frame 3 is not part of the sample
+    da[3] = 1000
+    assert _color_limits(da, framedim="time", sample=3)[1] == 100
+
+
+def test_movie_limits_cache(tmpdir):
+    da = test_dataarray()
+    mov = Movie(da, limits_cache=tmpdir.strpath, limits_sample=1)
+    assert len(tmpdir.listdir()) == 1
+    assert mov.kwargs["vmax"] == da.isel(time=0).max()
+
+
 def dummy_plotfunc(da, fig, timestep, framedim, **kwargs):
     # a very simple plotfunc, which might be passed by the user
     ax = fig.subplots()
@@ -84,6 +161,35 @@ def test_check_ffmpeg_version():
     pass
 
 
+def test_ffmpeg_capabilities():
+    capabilities = _ffmpeg_capabilities()
+    # probed once per process
+    assert _ffmpeg_capabilities() is capabilities
+    assert _check_ffmpeg_version() is _check_ffmpeg_version()
+    assert "libx264" in capabilities.encoders
+    assert "yuv420p" in capabilities.pix_fmts
+    # only video encoders
+    assert "aac" not in capabilities.encoders
+
+
+def test_ffmpeg_options():
+    assert _ffmpeg_options("draft") == FFMPEG_PROFILES["draft"]
+    assert _ffmpeg_options("-c:v libx265") == "-c:v libx265"
+    qualities = list(FFMPEG_PROFILES)
+    for quality in qualities:
+        options = _ffmpeg_options("auto:%s" % quality)
+        # the fastest candidate that reaches the quality
+        candidates = [
+            options
+            for candidate_quality, options in _AUTO_ENCODERS
+            if qualities.index(candidate_quality) >= qualities.index(quality)
+        ]
+        assert options in candidates
+    assert _ffmpeg_options("auto") == _ffmpeg_options("auto:balanced")
+    with pytest.raises(ValueError):
+        _ffmpeg_options("auto:best")
+
+
 @pytest.mark.parametrize("dir, fname, path", [("", "file", "file"), ("foo", "file", "foo/file")])
 @pytest.mark.parametrize("frame_pattern", ["frame_%05d.png", "test%05d.png"])
 @pytest.mark.parametrize("framerate", [5, 25])
@@ -104,6 +210,24 @@ def test_combine_ffmpeg_command(dir, fname, path, frame_pattern, framerate, ffmp
         path,
     )
     # TODO: needs more testing for the decomp of the movie filename.
+    cmd = _combine_ffmpeg_command(dir, fname, framerate, frame_pattern, ffmpeg_options, range(10, 15))
+    assert cmd.startswith("ffmpeg -start_number 10 -r")
+    assert "-frames:v 5 -y" in cmd
+
+
+@pytest.mark.parametrize("frame_size", [(400, 300), (1920, 1080)])
+@pytest.mark.parametrize("framerate", [5, 25])
+def test_stream_ffmpeg_command(frame_size, framerate):
+    ffmpeg_options = "-c:v libx264 -preset veryslow -crf 10 -pix_fmt yuv420p"
+    cmd = _stream_ffmpeg_command("foo/movie.mp4", framerate, frame_size, ffmpeg_options)
+    assert cmd == 'ffmpeg -f rawvideo -pix_fmt rgba -s %ix%i -r %i -i - -y %s -r %i "%s"' % (
+        frame_size[0],
+        frame_size[1],
+        framerate,
+        ffmpeg_options,
+        framerate,
+        "foo/movie.mp4",
+    )
 
 
 def test_execute_command():
@@ -124,6 +248,59 @@ def test_check_ffmpeg_execute():
         _check_ffmpeg_execute("ls -l?")
 
 
+def test_ffmpeg_process(tmpdir):
+    events = []
+    path = tmpdir.join("test.mp4").strpath
+    p = FFmpegProcess(
+        "ffmpeg -f lavfi -i testsrc=size=64x48:rate=10 -frames:v 20 -y %s" % path, callback=events.append
+    )
+    assert p.wait() is p
+    assert p.poll() == 0
+    assert events and events[-1] is p.progress
+    assert p.progress["progress"] == "end"
+    assert p.progress["frame"] == 20
+    assert isinstance(p.progress["fps"], float)
+    assert isinstance(p.progress["bitrate"], (float, type(None)))
+
+    # the output of failing commands ends up in the error
+    p = FFmpegProcess("ffmpeg -i %s" % tmpdir.join("missing.mp4").strpath)
+    with pytest.raises(RuntimeError, match="missing.mp4"):
+        p.wait()
+    assert p.returncode != 0
+    assert p.wait(error=False) is p
+
+
+def test_ffmpeg_process_background():
+    done = []
+    p = FFmpegProcess("sleep 10")
+    p.add_done_callback(done.append)
+    assert p.poll() is None
+    with pytest.raises(TimeoutError):
+        p.wait(timeout=0.1)
+    p.cancel()
+    assert p.returncode != 0
+    assert done == [p]
+    # called right away once the command finished
+    p.add_done_callback(done.append)
+    assert done == [p, p]
+
+
+# seconds `import xmovie` may take on top of importing xarray and matplotlib
+IMPORT_TIME_BUDGET = 0.3
+
+
+def test_import_time():
+    # in a fresh interpreter, nothing has been imported before
+    code = (
+        "import sys, time; import matplotlib.pyplot, xarray; t = time.perf_counter(); "
+        "import xmovie; print(time.perf_counter() - t); print(*sys.modules)"
+    )
+    duration, modules = subprocess.check_output([sys.executable, "-c", code], text=True).splitlines()
+    # cartopy and shapely are only needed by the geographic presets, dask by dask-backed data
+    assert not [m for m in modules.split() if m.split(".")[0] in ["cartopy", "shapely", "dask"]]
+    assert float(duration) < IMPORT_TIME_BUDGET
+
+
 def test_dataarray():
     """Create a little test dataset"""
     x = np.arange(4)
@@ -281,6 +458,67 @@ def test_movie_render_frame(plotfunc, expected_empty):
     # This needs to be tested more exensively, especially whith multiple axes
 
 
+def test_movie_iter_frames_reuse_figure():
+    da = test_dataarray()
+    mov = Movie(da)
+    figs = [fig for timestep, fig in mov._iter_frames(range(len(da.time)))]
+    assert all(fig is figs[0] for fig in figs)
+    assert not plt.fignum_exists(figs[0].number)
+
+    # functions without the setup/update protocol get a new figure for each frame
+    mov = Movie(da, plotfunc=dummy_plotfunc)
+    figs = [fig for timestep, fig in mov._iter_frames(range(len(da.time)))]
+    assert figs[0] is not figs[1]
+
+
+def test_movie_init_no_render():
+    da = test_dataarray()
+    calls = []
+
+    def plotfunc(da, fig, timestep, framedim, **kwargs):
+        calls.append(timestep)
+        return dummy_plotfunc(da, fig, timestep, framedim, **kwargs)
+
+    # nothing is plotted before the first frame
+    mov = Movie(da, plotfunc=plotfunc, vmin=0, vmax=1)
+    assert calls == []
+    with pytest.warns(UserWarning, match="got 0 output arguments"):
+        fig, ax, pp = mov.render_single_frame(1)
+    assert ax is None and pp is None
+    assert mov.plotfunc_n_outargs == 0
+    assert calls == [1]
+
+    # the number of outputs is checked with a trial frame if needed before
+    mov = Movie(da, plotfunc=plotfunc, vmin=0, vmax=1)
+    assert mov.plotfunc_n_outargs == 0
+    assert calls == [1, 0]
+    plt.close("all")
+
+
+class DummyPlotter:
+    """Plotfunc which only implements the setup/update protocol"""
+
+    def setup(self, fig, da, framedim, **kwargs):
+        ax = fig.subplots()
+        pp = ax.plot(da.isel({framedim: 0}).values)[0]
+        return dict(ax=ax, pp=pp, da=da, framedim=framedim, updated=[])
+
+    def update(self, state, timestep):
+        state["pp"].set_ydata(state["da"].isel({state["framedim"]: timestep}).values)
+        state["updated"].append(timestep)
+        return state["ax"], state["pp"]
+
+
+def test_movie_setup_update_protocol(tmpdir):
+    da = xr.DataArray(np.random.rand(5, 3), dims=["x", "time"])
+    mov = Movie(da, plotfunc=DummyPlotter(), input_check=False)
+    assert mov.plotfunc_n_outargs == 2
+    fig, ax, pp = mov.render_single_frame(1)
+    np.testing.assert_array_equal(pp.get_ydata(), da.isel(time=1).values)
+    mov.save_frames_serial(tmpdir)
+    assert all(tmpdir.join("frame_%05d.png" % ff).exists() for ff in range(3))
+
+
 def test_movie_preview():
     da = test_dataarray()
     mov = Movie(da)
@@ -343,6 +581,36 @@ def test_movie_save(tmpdir, parallel, filename, gif_palette, framerate, gif_fram
         mov.save(path.strpath, overwrite_existing=False)
 
 
+@pytest.mark.parametrize("max_workers", [1, 2, 5])
+@pytest.mark.parametrize("chunked", [True, False])
+def test_movie_save_frames_processes(tmpdir, max_workers, chunked):
+    da = xr.DataArray(np.random.rand(4, 5, 3), dims=["x", "y", "time"])
+    if chunked:
+        da = da.chunk({"time": 2})
+    mov = Movie(da)
+    mov.save_frames_processes(tmpdir, max_workers=max_workers)
+    filenames = [tmpdir.join("frame_%05d.png" % ff) for ff in range(len(da.time))]
+    assert all([fn.exists() for fn in filenames])
+
+
+def test_movie_save_frames_processes_error(tmpdir):
+    mov = Movie(test_dataarray(), plotfunc=failing_plotfunc)
+    with pytest.raises(ZeroDivisionError):
+        mov.save_frames_processes(tmpdir, max_workers=2)
+
+
+def test_movie_save_processes(tmpdir):
+    path = tmpdir.join("movie.mp4")
+    da = test_dataarray()
+    mov = Movie(da)
+    mov.save(path.strpath, executor="processes", max_workers=2)
+    video = cv2.VideoCapture(path.strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+
+    with pytest.raises(ValueError):
+        mov.save(path.strpath, executor="threads", overwrite_existing=True)
+
+
 def test_movie_save_parallel_no_dask(tmpdir):
     path = tmpdir.join("movie.mp4")
     da = test_dataarray()
@@ -356,16 +624,868 @@ def test_movie_save_parallel_no_dask(tmpdir):
     assert "Input data needs to be a dask array to save in parallel" in str(excinfo.value)
 
 
-def test_movie_save_parallel_wrong_chunk(tmpdir):
-    path = tmpdir.join("movie.mp4")
-    da = test_dataarray().chunk({"time": 2})
+@pytest.mark.parametrize("chunks", [{"time": 2}, {"time": 3}, {"time": (1, 4)}, {"time": 2, "x": 2}])
+def test_movie_save_frames_parallel_chunks(tmpdir, chunks):
+    da = xr.DataArray(np.random.rand(4, 5, 5), dims=["x", "y", "time"]).chunk(chunks)
     mov = Movie(da)
-    with pytest.raises(ValueError) as excinfo:
+    mov.save_frames_parallel(tmpdir)
+    filenames = [tmpdir.join("frame_%05d.png" % ff) for ff in range(len(da.time))]
+    assert all([fn.exists() for fn in filenames])
+    # no extra frames
+    assert len(tmpdir.listdir()) == len(da.time)
+
+
+def test_movie_save_frames_parallel_loads_chunks_once(tmpdir):
+    values = np.random.rand(5, 5, 4)
+    loads = []
+
+    def load_block(block_id):
+        loads.append(block_id)
+        start = 2 * block_id[2]
+        return values[:, :, start : start + 2]
+
+    data = dsa.map_blocks(load_block, chunks=((5,), (5,), (2, 2)), meta=np.array((), dtype=float))
+    da = xr.DataArray(data, dims=["x", "y", "time"])
+    mov = Movie(da, vmin=0, vmax=1)
+    mov.save_frames_parallel(tmpdir, parallel_compute_kwargs=dict(scheduler="threads"))
+    # every chunk was read once, not once per frame
+    assert sorted(loads) == [(0, 0, 0), (0, 0, 1)]
+    assert len(tmpdir.listdir()) == 4
+
+    # the frames match the serial rendering
+    serial = tmpdir.mkdir("serial")
+    Movie(da.copy(data=values), vmin=0, vmax=1).save_frames_serial(serial)
+    for tt in range(4):
+        name = "frame_%05d.png" % tt
+        np.testing.assert_array_equal(
+            np.array(Image.open(tmpdir.join(name).strpath)),
+            np.array(Image.open(serial.join(name).strpath)),
+        )
+
+
+@pytest.mark.parametrize("filename", ["movie.mp4", "movie.gif"])
+@pytest.mark.parametrize("framerate", [5, 20])
+def test_movie_save_stream(tmpdir, filename, framerate):
+    path = tmpdir.join(filename)
+    da = test_dataarray()
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    mov.save(path.strpath, framerate=framerate, intermediate="stream")
+
+    assert path.exists()
+    # no intermediate frames were written
+    assert not tmpdir.listdir(fil=lambda f: f.ext == ".png")
+    if ".mp4" in filename:
+        video = cv2.VideoCapture(path.strpath)
+        assert video.get(cv2.CAP_PROP_FPS) == framerate
+        assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+        assert video.get(cv2.CAP_PROP_FRAME_WIDTH) == 400
+        assert video.get(cv2.CAP_PROP_FRAME_HEIGHT) == 300
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_movie_save_frames_raster(tmpdir, parallel):
+    da = test_dataarray().chunk({"time": 1})
+    mov = Movie(da, raster, pixelwidth=400, pixelheight=300)
+    if parallel:
+        mov.save_frames_parallel(tmpdir)
+    else:
+        mov.save_frames_serial(tmpdir)
+    for tt in range(len(da.time)):
+        saved = np.array(Image.open(tmpdir.join("frame_%05d.png" % tt).strpath))
+        fig, ax, pp = mov.render_single_frame(tt)
+        fig.canvas.draw()
+        expected = np.array(fig.canvas.buffer_rgba())
+        plt.close(fig)
+        assert saved.shape == expected.shape == (300, 400, 4)
+        assert (saved != expected).any(axis=-1).mean() < 0.01
+
+
+def test_movie_save_stream_raster(tmpdir):
+    path = tmpdir.join("movie.mp4")
+    da = test_dataarray()
+    mov = Movie(da, raster, pixelwidth=400, pixelheight=300)
+    profile = mov.save(path.strpath, intermediate="stream", profile=True)
+    video = cv2.VideoCapture(path.strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+    assert video.get(cv2.CAP_PROP_FRAME_WIDTH) == 400
+    # the figure is never drawn for a frame
+    assert "draw" not in {record["stage"] for record in profile.records}
+
+
+@pytest.mark.parametrize(
+    "plotfunc, kwargs",
+    [
+        (basic, dict()),
+        (basic, dict(plotmethod="contourf")),
+        (rotating_globe, dict(lon_rotations=0, coastline=False, gridlines=True)),
+        (rotating_globe, dict(coastline=False)),
+    ],
+)
+def test_movie_save_frames_blit(tmpdir, plotfunc, kwargs):
+    # the figure is drawn completely for the first two frames
+    da = xr.concat([test_dataarray()] * 3, "time").assign_coords(time=range(6))
+    mov = Movie(da, plotfunc, pixelwidth=400, pixelheight=300, blit=True, **kwargs)
+    profile = SaveProfile()
+    mov.save_frames_serial(tmpdir, profile=profile)
+    assert "draw" in {record["stage"] for record in profile.records}
+    for tt in range(len(da.time)):
+        saved = np.array(Image.open(tmpdir.join("frame_%05d.png" % tt).strpath))
+        fig, ax, pp = mov.render_single_frame(tt)
+        fig.canvas.draw()
+        expected = np.array(fig.canvas.buffer_rgba())
+        plt.close(fig)
+        assert saved.shape == expected.shape == (300, 400, 4)
+        assert (np.abs(saved.astype(int) - expected).max(axis=-1) > 8).mean() < 0.001
+
+
+def test_movie_blit_plotfunc():
+    da = test_dataarray()
+    with pytest.raises(ValueError, match="blit"):
+        Movie(da, failing_plotfunc, blit=True)
+
+
+@pytest.mark.parametrize("writers", [0, 2])
+@pytest.mark.parametrize("extension", [".png", ".ppm", ".bmp", ".pam"])
+def test_movie_save_frames_formats(tmpdir, extension, writers):
+    da = test_dataarray()
+    kwargs = dict(pixelwidth=400, pixelheight=300, vmin=0, vmax=1)
+    Movie(da, **kwargs).save_frames_serial(tmpdir.mkdir("expected"))
+    mov = Movie(da, frame_pattern="frame_%05d" + extension, **kwargs)
+    profile = SaveProfile()
+    mov.save_frames_serial(tmpdir.mkdir("frames"), profile=profile, writers=writers)
+    for tt in range(len(da.time)):
+        expected = np.array(Image.open(tmpdir.join("expected", "frame_%05d.png" % tt).strpath))
+        path = tmpdir.join("frames", "frame_%05d%s" % (tt, extension))
+        if extension == ".pam":
+            # raw RGBA after the header
+            saved = np.frombuffer(path.read_binary().split(b"ENDHDR\n", 1)[1], dtype=np.uint8)
+            saved = saved.reshape(expected.shape)
+        else:
+            saved = np.array(Image.open(path.strpath))
+        channels = 3 if extension in [".ppm", ".bmp"] else 4
+        np.testing.assert_array_equal(saved, expected[..., :channels])
+    # the pictures are written on other threads
+    threads = {record["thread"] for record in profile.records if record["stage"] == "savefig"}
+    assert (threading.get_ident() in threads) == (not writers)
+
+
+@pytest.mark.parametrize("extension", [".ppm", ".pam"])
+def test_movie_save_formats(tmpdir, extension):
+    path = tmpdir.join("movie.mp4")
+    da = test_dataarray()
+    mov = Movie(da, pixelwidth=400, pixelheight=300, frame_pattern="frame_%05d" + extension)
+    mov.save(path.strpath, writers=2, remove_frames=False)
+    assert len(tmpdir.listdir(fil=lambda f: f.ext == extension)) == len(da.time)
+    video = cv2.VideoCapture(path.strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+    assert video.get(cv2.CAP_PROP_FRAME_WIDTH) == 400
+
+
+@pytest.mark.parametrize("intermediate", ["files", "stream", "store"])
+@pytest.mark.parametrize("ffmpeg_options", ["draft", "auto"])
+def test_movie_save_ffmpeg_profile(tmpdir, intermediate, ffmpeg_options):
+    path = tmpdir.join("movie.mp4")
+    mov = Movie(test_dataarray(), pixelwidth=400, pixelheight=300)
+    mov.save(path.strpath, intermediate=intermediate, ffmpeg_options=ffmpeg_options)
+    video = cv2.VideoCapture(path.strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == 2
+
+
+@pytest.mark.parametrize("intermediate", ["files", "stream", "store"])
+@pytest.mark.parametrize("gif_palette", [False, True, "palettes"])
+def test_movie_save_gif_direct(tmpdir, intermediate, gif_palette):
+    path = tmpdir.join("movie.gif")
+    da = xr.DataArray(np.random.rand(4, 5, 6), dims=["x", "y", "time"])
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    if gif_palette == "palettes":
+        gif_palette = tmpdir.join("palettes").strpath
+    mov.save(
+        path.strpath, intermediate=intermediate, gif_palette=gif_palette, framerate=6, gif_framerate=3
+    )
+    gif = Image.open(path.strpath)
+    assert gif.size == (480, 320)
+    assert gif.info["duration"] == 330
+    assert gif.n_frames == 3
+    # no movie is encoded, and no frames or palettes are left
+    expected = ["movie.gif"] if gif_palette in [False, True] else ["movie.gif", "palettes"]
+    assert sorted(f.basename for f in tmpdir.listdir()) == expected
+
+    if gif_palette not in [False, True]:
+        (palette,) = tmpdir.join("palettes").listdir()
+        palette.setmtime(0)
         mov.save(
-            path.strpath,
-            parallel=True,
+            path.strpath, intermediate=intermediate, gif_palette=gif_palette, overwrite_existing=True
         )
-    assert "Input data needs to be a with single chunks along" in str(excinfo.value)
+        # reused
+        assert tmpdir.join("palettes").listdir() == [palette]
+        assert palette.mtime() == 0
+        # the palette of other data is generated again
+        mov = Movie(da + 1, pixelwidth=400, pixelheight=300)
+        mov.save(
+            path.strpath, intermediate=intermediate, gif_palette=gif_palette, overwrite_existing=True
+        )
+        assert len(tmpdir.join("palettes").listdir()) == 2
+
+
+def test_movie_save_gif_direct_pam(tmpdir):
+    path = tmpdir.join("movie.gif")
+    mov = Movie(test_dataarray(), pixelwidth=400, pixelheight=300, frame_pattern="frame_%05d.pam")
+    mov.save(path.strpath, gif_palette=True, remove_frames=False, gif_framerate=15)
+    assert Image.open(path.strpath).n_frames == 2
+    fig, ax, pp = mov.render_single_frame(1)
+    fig.canvas.draw()
+    np.testing.assert_array_equal(
+        _load_picture(tmpdir.join("frame_00001.pam").strpath), np.array(fig.canvas.buffer_rgba())
+    )
+    plt.close(fig)
+
+
+def test_movie_compress_level(tmpdir):
+    da = test_dataarray()
+    for level in [0, 9]:
+        mov = Movie(da, pixelwidth=400, pixelheight=300, vmin=0, vmax=1, compress_level=level)
+        mov.save_frames_serial(tmpdir.mkdir(str(level)))
+    uncompressed = tmpdir.join("0", "frame_00000.png")
+    compressed = tmpdir.join("9", "frame_00000.png")
+    assert uncompressed.size() > 2 * compressed.size()
+    np.testing.assert_array_equal(
+        np.array(Image.open(uncompressed.strpath)), np.array(Image.open(compressed.strpath))
+    )
+
+
+def test_frame_writer():
+    def write(frame):
+        time.sleep(0.01 * max(3 - frame, 0))
+        if frame == 4:
+            raise ZeroDivisionError("write failed")
+
+    with _FrameWriter(2) as writer:
+        done = []
+        for frame in range(4):
+            done += writer.submit(frame, write, frame)
+        done += writer.wait()
+        # in order, even if written out of order
+        assert done == list(range(4))
+        writer.submit(4, write, 4)
+        with pytest.raises(ZeroDivisionError):
+            writer.wait()
+    with _FrameWriter() as writer:
+        assert writer.submit(1, write, 1) == [1]
+
+    # writes that did not start yet are cancelled on exit
+    written = []
+    with _FrameWriter(1) as writer:
+        writer.submit(0, time.sleep, 0.2)
+        writer.submit(1, written.append, 1)
+    assert written == []
+
+
+def failing_plotfunc(da, fig, timestep, framedim, **kwargs):
+    if timestep == 1:
+        raise ZeroDivisionError("frame failed")
+    return basic(da, fig, timestep, framedim, **kwargs)
+
+
+# frames `flaky_plotfunc` fails on (once each)
+flaky_frames = set()
+
+
+def flaky_plotfunc(da, fig, timestep, framedim, **kwargs):
+    if timestep in flaky_frames:
+        flaky_frames.discard(timestep)
+        raise ZeroDivisionError("frame failed")
+    return basic(da, fig, timestep, framedim, **kwargs)
+
+
+def test_movie_save_frames_resume(tmpdir):
+    da = test_dataarray()
+    mov = Movie(da, plotfunc=flaky_plotfunc, pixelwidth=400, pixelheight=300)
+    flaky_frames.update([1])
+    with pytest.raises(ZeroDivisionError):
+        mov.save_frames_serial(tmpdir, resume=True)
+    assert tmpdir.join("frame_00000.png").exists()
+    assert not tmpdir.join("frame_00001.png").exists()
+    assert tmpdir.join("xmovie_manifest.jsonl").exists()
+
+    # existing frames are not rendered again
+    tmpdir.join("frame_00000.png").write("dummy")
+    mov.save_frames_serial(tmpdir, resume=True)
+    assert tmpdir.join("frame_00000.png").read() == "dummy"
+    for fi in range(len(da.time)):
+        assert tmpdir.join("frame_%05d.png" % fi).exists()
+
+    # frames saved with other settings are stale
+    Movie(da, plotfunc=flaky_plotfunc, pixelwidth=400, pixelheight=200).save_frames_serial(
+        tmpdir, resume=True
+    )
+    assert tmpdir.join("frame_00000.png").read_binary() != b"dummy"
+
+
+@pytest.mark.parametrize("retries", [1, 2])
+def test_movie_save_frames_retries(tmpdir, retries):
+    mov = Movie(test_dataarray(), plotfunc=flaky_plotfunc, pixelwidth=400, pixelheight=300)
+    flaky_frames.update([0, 1])
+    mov.save_frames_serial(tmpdir, retries=retries)
+    assert not flaky_frames
+    assert len(tmpdir.listdir()) == len(mov.data.time)
+
+
+def test_movie_save_frames_retries_error(tmpdir):
+    mov = Movie(test_dataarray(), plotfunc=failing_plotfunc, pixelwidth=400, pixelheight=300)
+    with pytest.raises(RuntimeError, match=r"\[1\] failed after 3 attempts") as excinfo:
+        mov.save_frames_serial(tmpdir, retries=2)
+    assert isinstance(excinfo.value.__cause__, ZeroDivisionError)
+    assert len(tmpdir.listdir()) == len(mov.data.time) - 1
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_movie_save_resume(tmpdir, parallel):
+    da = test_dataarray()
+    if parallel:
+        da = da.chunk({"time": 1})
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    mov.save_frames_serial(tmpdir, resume=True)
+    tmpdir.join("frame_00001.png").remove()
+    path = tmpdir.join("movie.mp4")
+    mov.save(path.strpath, parallel=parallel, resume=True)
+    assert path.exists()
+    assert tmpdir.listdir() == [path]
+
+
+def test_frame_cache(tmpdir):
+    cache = _FrameCache(tmpdir.join("cache").strpath, max_size=25)
+    for key in "abc":
+        tmpdir.join(key + ".png").write(key * 10)
+        cache.put(key, tmpdir.join(key + ".png").strpath)
+        time.sleep(0.01)
+    # only the last two frames fit
+    assert not cache.get("a", tmpdir.join("out.png").strpath)
+    assert cache.get("b", tmpdir.join("out.png").strpath)
+    assert tmpdir.join("out.png").read() == "b" * 10
+    # `b` was used more recently than `c`
+    time.sleep(0.01)
+    tmpdir.join("d.png").write("d" * 10)
+    cache.put("d", tmpdir.join("d.png").strpath)
+    assert cache.get("b", tmpdir.join("out.png").strpath)
+    assert not cache.get("c", tmpdir.join("out.png").strpath)
+
+
+def test_movie_frame_cache(tmpdir):
+    da = test_dataarray()
+    cache = tmpdir.join("cache")
+    kwargs = dict(
+        plotfunc=flaky_plotfunc, pixelwidth=400, pixelheight=300, vmin=0, vmax=1, frame_cache=cache
+    )
+    Movie(da, **kwargs).save_frames_serial(tmpdir.mkdir("a"))
+    assert len(cache.listdir()) == len(da.time)
+
+    # cached frames are not rendered again
+    mov = Movie(da, **kwargs)
+    flaky_frames.update([0, 1])
+    mov.save_frames_serial(tmpdir.mkdir("b"))
+    for fi in range(len(da.time)):
+        frame = "frame_%05d.png" % fi
+        assert tmpdir.join("b", frame).read_binary() == tmpdir.join("a", frame).read_binary()
+
+    # only frames with changed data are rendered again
+    da[{"time": 1}] = 0
+    flaky_frames.clear()
+    mov = Movie(da, **kwargs)
+    flaky_frames.update([0, 1])
+    with pytest.raises(ZeroDivisionError):
+        mov.save_frames_serial(tmpdir.mkdir("c"))
+    assert tmpdir.join("c", "frame_00000.png").exists()
+    assert flaky_frames == {0}
+    flaky_frames.clear()
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        ("mean", [[5.5, 7.5, 9], [20.5, 22.5, 24], [30.5, 32.5, 34]]),
+        ("max", [[11, 13, 14], [26, 28, 29], [31, 33, 34]]),
+        ("nearest", [[0, 2, 4], [15, 17, 19], [30, 32, 34]]),
+    ],
+)
+def test_decimate(method, expected):
+    da = xr.DataArray(
+        np.arange(2 * 7 * 5.0).reshape(2, 7, 5),
+        coords=[("time", [0, 1]), ("y", np.arange(7.0)), ("x", np.arange(5.0))],
+    ).chunk({"time": 1})
+    decimated = _decimate(da, "time", 3, method=method)
+    # the decimation is part of the dask graph
+    assert isinstance(decimated.data, dsa.Array)
+    assert dict(decimated.sizes) == dict(time=2, y=3, x=3)
+    np.testing.assert_allclose(decimated.isel(time=0).values, expected)
+    # small enough data is not changed
+    assert _decimate(da, "time", 7, method=method) is da
+    with pytest.raises(ValueError):
+        _decimate(da, "time", 3, method="median")
+
+
+def test_movie_decimate():
+    da = xr.DataArray(
+        np.random.rand(1000, 300, 2),
+        coords=[("x", np.arange(1000)), ("y", np.arange(300)), ("time", [0, 1])],
+    )
+    with pytest.warns(UserWarning):
+        mov = Movie(da, pixelwidth=200, pixelheight=100, decimate=True)
+    assert mov.decimate == "mean"
+    assert dict(mov.data.sizes) == dict(x=200, y=150, time=2)
+    # color limits are taken from the full data
+    assert mov.kwargs["vmin"] == da.min() and mov.kwargs["vmax"] == da.max()
+    fig, ax, pp = mov.render_single_frame(1)
+    assert pp.get_array().size == 200 * 150
+    plt.close(fig)
+
+    mov = Movie(da, pixelwidth=200, pixelheight=100, vmin=0, vmax=1)
+    assert mov.decimate is None
+    assert mov.data is da
+
+
+@pytest.mark.parametrize(
+    "save_kwargs, stages",
+    [
+        (dict(), {"load", "plot", "setup", "savefig", "ffmpeg"}),
+        (dict(parallel=True), {"load", "plot", "setup", "savefig", "ffmpeg"}),
+        (dict(executor="processes", max_workers=2), {"load", "plot", "setup", "savefig", "ffmpeg"}),
+        (dict(intermediate="stream"), {"setup", "load", "plot", "draw", "write", "ffmpeg"}),
+    ],
+)
+def test_movie_save_profile(tmpdir, save_kwargs, stages):
+    da = test_dataarray().chunk({"time": 1})
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    profile = mov.save(tmpdir.join("movie.mp4").strpath, profile=True, **save_kwargs)
+    assert isinstance(profile, SaveProfile)
+    assert {record["stage"] for record in profile.records} == stages
+    for stage in stages - {"setup", "ffmpeg"}:
+        frames = [record["frame"] for record in profile.records if record["stage"] == stage]
+        assert sorted(frames) == list(range(len(da.time)))
+    pids = {record["pid"] for record in profile.records if record["stage"] == "plot"}
+    if save_kwargs.get("executor") == "processes":
+        assert os.getpid() not in pids
+    else:
+        assert pids == {os.getpid()}
+    assert list(profile.summary().index) == list(dict.fromkeys(r["stage"] for r in profile.records))
+    # every frame is loaded before it is plotted
+    for frame in range(len(da.time)):
+        stages = [r["stage"] for r in profile.records if r["frame"] == frame]
+        assert stages.index("load") < stages.index("plot")
+    if sys.platform == "linux":
+        assert all(r["rss"] > 0 and isinstance(r["rss_delta"], int) for r in profile.records)
+
+    profile.to_jsonl(tmpdir.join("profile.jsonl").strpath)
+    lines = tmpdir.join("profile.jsonl").readlines()
+    assert [json.loads(line) for line in lines] == profile.records
+
+    profile.to_chrome_trace(tmpdir.join("trace.json").strpath)
+    events = json.loads(tmpdir.join("trace.json").read())["traceEvents"]
+    assert [event["name"] for event in events] == [record["stage"] for record in profile.records]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_movie_save_no_profile(tmpdir):
+    mov = Movie(test_dataarray(), pixelwidth=400, pixelheight=300)
+    assert mov.save(tmpdir.join("movie.mp4").strpath) is None
+
+
+def test_save_progress():
+    reports = []
+    progress = SaveProgress(4, callback=lambda progress: reports.append(progress.summary()))
+    assert progress.eta is None
+    progress.update([0, 1], worker="a")
+    progress.update([2])
+    assert progress.frames_done == 3
+    assert progress.workers["a"] == 2 and sum(progress.workers.values()) == 3
+    assert progress.fps > 0 and progress.eta > 0
+    assert [report["frames_done"] for report in reports] == [2, 3]
+    assert reports[-1]["n_frames"] == 4
+    assert reports[-1]["workers"]["a"]["frames_done"] == 2
+    assert "3/4 frames" in repr(progress)
+
+
+@pytest.mark.parametrize(
+    "kwargs, workers",
+    [
+        (dict(), 1),
+        (dict(writers=2), 1),
+        (dict(intermediate="stream"), 1),
+        (dict(executor="dask"), None),
+        (dict(executor="processes", max_workers=2), 2),
+    ],
+)
+def test_movie_save_progress(tmpdir, kwargs, workers):
+    da = test_dataarray()
+    if kwargs.get("executor") == "dask":
+        da = da.chunk({"time": 1})
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    reports = []
+    mov.save(
+        tmpdir.join("movie.mp4").strpath,
+        progress=lambda progress: reports.append(progress.summary()),
+        **kwargs,
+    )
+    # every frame is reported as soon as its chunk/worker saved it
+    assert [report["frames_done"] for report in reports] == list(range(1, len(da.time) + 1))
+    assert reports[-1]["eta"] == 0
+    if workers is not None:
+        assert len(reports[-1]["workers"]) == workers
+
+
+@pytest.mark.parametrize("dataset", [False, True])
+def test_frame_prefetcher(dataset):
+    da = test_dataarray().chunk({"time": 1})
+    da = xr.concat([da] * 3, dim="time").assign_coords(time=range(6))
+    data = da.to_dataset(name="a").assign(b=da * 2) if dataset else da
+    with _FramePrefetcher(data, "time", [1, 2, 3, 5], 2, depth=1) as prefetcher:
+        assert prefetcher.data is not data
+        xr.testing.assert_identical(prefetcher.data.isel(time=0).load(), data.isel(time=0).load())
+        for t in [1, 2, 3, 5]:
+            assert prefetcher.frame(t) is not None
+            xr.testing.assert_identical(prefetcher.data.isel(time=t).load(), data.isel(time=t).load())
+        # earlier frames are loaded as usual
+        assert prefetcher.frame(1) is None
+        xr.testing.assert_identical(prefetcher.data.load(), data.load())
+
+
+def test_frame_prefetcher_no_dask():
+    da = test_dataarray()
+    with _FramePrefetcher(da, "time", [0, 1], 2) as prefetcher:
+        assert prefetcher.data is da
+    with _FramePrefetcher(da.chunk(), "time", [0, 1], 0) as prefetcher:
+        assert prefetcher.data.chunks is not None
+
+
+@pytest.mark.parametrize("intermediate", ["files", "stream"])
+def test_movie_save_prefetch(tmpdir, intermediate):
+    da = test_dataarray().chunk({"time": 1})
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    if intermediate == "files":
+        mov.save_frames_serial(tmpdir.mkdir("a"))
+        mov.save_frames_serial(tmpdir.mkdir("b"), prefetch=2)
+        for fi in range(len(da.time)):
+            frame = "frame_%05d.png" % fi
+            assert tmpdir.join("b", frame).read_binary() == tmpdir.join("a", frame).read_binary()
+    profile = mov.save(
+        tmpdir.join("movie.mp4").strpath, intermediate=intermediate, prefetch=2, profile=True
+    )
+    assert {"prefetch", "load"} <= set(profile.summary().index)
+
+
+def test_movie_save_stream_error(tmpdir):
+    path = tmpdir.join("movie.mp4")
+    mov = Movie(test_dataarray(), plotfunc=failing_plotfunc, pixelwidth=400, pixelheight=300)
+    with pytest.raises(ZeroDivisionError):
+        mov.save(path.strpath, intermediate="stream")
+    assert not path.exists()
+
+
+def test_movie_save_stream_ffmpeg_error(tmpdir):
+    path = tmpdir.join("movie.mp4")
+    mov = Movie(test_dataarray(), pixelwidth=400, pixelheight=300)
+    with pytest.raises(RuntimeError):
+        mov.save(path.strpath, intermediate="stream", ffmpeg_options="-c:v not_an_encoder")
+    assert not path.exists()
+
+
+def test_movie_save_stream_parallel(tmpdir):
+    path = tmpdir.join("movie.mp4")
+    mov = Movie(test_dataarray().chunk({"time": 1}))
+    with pytest.raises(ValueError):
+        mov.save(path.strpath, parallel=True, intermediate="stream")
+
+
+class CountingPlotter(DummyPlotter):
+    """Plotfunc which counts how often its figure is set up"""
+
+    setups = []
+
+    def setup(self, fig, da, framedim, **kwargs):
+        self.setups.append(fig)
+        return super().setup(fig, da, framedim, **kwargs)
+
+
+@pytest.fixture
+def client():
+    distributed = pytest.importorskip("distributed")
+    with distributed.Client(processes=False, n_workers=1, threads_per_worker=1) as client:
+        yield client
+
+
+@pytest.mark.parametrize("kwargs", [dict(), dict(compress=False), dict(batch_size=2, max_pending=1)])
+def test_movie_save_frames_distributed(tmpdir, client, kwargs):
+    da = xr.DataArray(np.random.rand(5, 6), dims=["x", "time"])
+    mov = Movie(da, plotfunc=CountingPlotter(), pixelwidth=400, pixelheight=300, input_check=False)
+    reports = []
+    CountingPlotter.setups.clear()
+    mov.save_frames_distributed(
+        tmpdir.join("movie.mkv").strpath,
+        ffmpeg_options="-c:v ffv1",
+        progress=lambda progress: reports.append(progress.frames_done),
+        **kwargs,
+    )
+    # the worker thread keeps its figure
+    assert len(CountingPlotter.setups) == 1
+    assert reports[-1] == len(da.time)
+    # the plugin is removed again
+    assert not [
+        name
+        for names in client.run(lambda dask_worker: list(dask_worker.plugins)).values()
+        for name in names
+        if name.startswith("xmovie")
+    ]
+    mov.save_frames_stream(tmpdir.join("expected.mkv").strpath, ffmpeg_options="-c:v ffv1")
+    np.testing.assert_array_equal(
+        _video_frames(tmpdir.join("movie.mkv").strpath),
+        _video_frames(tmpdir.join("expected.mkv").strpath),
+    )
+
+
+def test_movie_save_distributed(tmpdir, client):
+    da = test_dataarray()
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    path = tmpdir.join("movie.mp4")
+    mov.save(path.strpath, executor="distributed", intermediate="stream", client=client)
+    video = cv2.VideoCapture(path.strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+    assert tmpdir.listdir() == [path]
+
+    # frames can not be saved into files on the workers
+    with pytest.raises(ValueError):
+        mov.save(path.strpath, executor="distributed", overwrite_existing=True)
+
+    # errors on the workers are raised and no movie is left behind
+    mov = Movie(da, plotfunc=lambda *args, **kwargs: 1 / 0, pixelwidth=400, pixelheight=300)
+    with pytest.raises(ZeroDivisionError):
+        mov.save_frames_distributed(tmpdir.join("failed.mp4").strpath)
+    assert not tmpdir.join("failed.mp4").exists()
+
+
+class OldClient:
+    """Client of older versions of distributed, without `Client.register_plugin`"""
+
+    def __init__(self, client):
+        self.client = client
+        self.plugins = []
+
+    def register_worker_plugin(self, plugin):
+        self.plugins.append(plugin)
+        return self.client.register_plugin(plugin)
+
+    def __getattr__(self, name):
+        if name == "register_plugin":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+
+def test_movie_save_distributed_old_client(tmpdir, client):
+    mov = Movie(test_dataarray(), pixelwidth=400, pixelheight=300)
+    old_client = OldClient(client)
+    mov.save_frames_distributed(tmpdir.join("movie.mp4").strpath, client=old_client)
+    assert len(old_client.plugins) == 1
+    assert len(_video_frames(tmpdir.join("movie.mp4").strpath)) == 2
+
+
+def test_movie_worker_plugin_error():
+    pytest.importorskip("distributed")
+    from xmovie._distributed import MovieWorkerPlugin
+
+    mov = Movie(test_dataarray(), plotfunc=failing_plotfunc, pixelwidth=400, pixelheight=300)
+    plugin = MovieWorkerPlugin(mov, "xmovie-test")
+    plugin.setup(None)
+    assert len(plugin.render([0])) == 1
+    (warm,) = plugin._warm
+    with pytest.raises(ZeroDivisionError):
+        plugin.render([1])
+    # the broken figure is dropped, and the next frame starts with a fresh one
+    assert plugin._warm == []
+    assert len(plugin.render([0])) == 1
+    assert plugin._warm and plugin._warm[0] is not warm
+    plugin.teardown(None)
+
+
+def test_frame_store(tmpdir):
+    path = tmpdir.join("frames.npy").strpath
+    store = FrameStore.create(path, 3, 40, 30)
+    assert len(store) == 3
+    assert store.frame_size == (40, 30)
+    y, x = np.mgrid[:30, :40]
+    picture = np.stack([x * 6, y * 8, np.full_like(x, 100), np.full_like(x, 255)], axis=-1)
+    for frame in range(3):
+        store.write(frame, picture.astype(np.uint8))
+    with pytest.raises(RuntimeError, match="size"):
+        store.write(0, np.zeros((30, 30, 4), dtype=np.uint8))
+    # the file can be read as a regular array
+    np.testing.assert_array_equal(np.load(path)[2], picture)
+    # workers map the file themselves
+    assert pickle.loads(pickle.dumps(store))._frames is None
+
+    mpath = tmpdir.join("movie.mp4").strpath
+    store.encode(mpath, framerate=5, ffmpeg_options="-c:v libx264 -crf 0 -pix_fmt yuv444p")
+    video = cv2.VideoCapture(mpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == 3
+    ok, frame = video.read()
+    # the header of the file is skipped
+    assert np.abs(frame[..., ::-1].astype(int) - picture[..., :3]).max() <= 2
+    store.encode(mpath, framerate=5, segments=2)
+    assert len(_video_frames(mpath)) == 3
+
+    store.remove()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(writers=2),
+        dict(parallel=True),
+        dict(executor="processes", max_workers=2),
+    ],
+)
+def test_movie_save_store(tmpdir, kwargs):
+    path = tmpdir.join("movie.mp4")
+    da = test_dataarray().chunk({"time": 1})
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    mov.save(path.strpath, intermediate="store", remove_frames=False, **kwargs)
+    video = cv2.VideoCapture(path.strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+    assert video.get(cv2.CAP_PROP_FRAME_WIDTH) == 400
+    # no frame files were written, only the store
+    assert not tmpdir.listdir(fil=lambda f: f.ext == ".png")
+    store = FrameStore(tmpdir.join("movie_frames.npy").strpath)
+    for tt in range(len(da.time)):
+        fig, ax, pp = mov.render_single_frame(tt)
+        fig.canvas.draw()
+        np.testing.assert_array_equal(store.frames[tt], np.array(fig.canvas.buffer_rgba()))
+        plt.close(fig)
+
+    # encode again without rendering
+    store.encode(tmpdir.join("again.mp4").strpath, framerate=5)
+    video = cv2.VideoCapture(tmpdir.join("again.mp4").strpath)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == len(da.time)
+
+    mov.save(path.strpath, intermediate="store", overwrite_existing=True)
+    assert not tmpdir.join("movie_frames.npy").exists()
+    with pytest.raises(ValueError):
+        mov.save(path.strpath, intermediate="store", resume=True, overwrite_existing=True)
+    assert not tmpdir.join("movie_frames.npy").exists()
+
+
+def test_movie_save_store_error(tmpdir):
+    path = tmpdir.join("movie.mp4")
+    mov = Movie(test_dataarray(), plotfunc=failing_plotfunc, pixelwidth=400, pixelheight=300)
+    with pytest.raises(ZeroDivisionError):
+        mov.save(path.strpath, intermediate="store")
+    # the partial store is removed
+    assert not tmpdir.listdir()
+
+    # an existing store is not overwritten
+    tmpdir.join("movie_frames.npy").write("")
+    with pytest.raises(RuntimeError, match="already exists"):
+        mov.save(path.strpath, intermediate="store")
+    assert tmpdir.join("movie_frames.npy").exists()
+
+
+@pytest.mark.parametrize("filename", ["movie.mp4", "movie.gif"])
+@pytest.mark.parametrize("intermediate", ["files", "store"])
+def test_movie_save_background(tmpdir, filename, intermediate):
+    da = test_dataarray()
+    mov = Movie(da)
+    dirs = [tmpdir.mkdir("a"), tmpdir.mkdir("b")]
+    processes = [
+        mov.save(d.join(filename).strpath, intermediate=intermediate, framerate=5, wait=False)
+        for d in dirs
+    ]
+    for d, p in zip(dirs, processes):
+        assert isinstance(p, FFmpegProcess)
+        p.wait()
+        assert d.join(filename).exists()
+        # the frames are removed once the movie is encoded
+        assert d.listdir() == [d.join(filename)]
+
+    path = tmpdir.join(filename).strpath
+    with pytest.raises(ValueError):
+        mov.save(path, intermediate="stream", wait=False)
+    with pytest.raises(ValueError):
+        mov.save(path, segments=2, wait=False)
+    with pytest.raises(ValueError):
+        mov.save(tmpdir.join("movie.gif").strpath, remove_movie=False, wait=False)
+
+
+def test_write_movie_background(tmpdir):
+    mov = Movie(test_dataarray())
+    mov.save_frames_serial(tmpdir)
+    p = combine_frames_into_movie(tmpdir, "movie.mp4", framerate=5, wait=False)
+    assert p.wait().returncode == 0
+    assert tmpdir.listdir() == [tmpdir.join("movie.mp4")]
+
+
+def _video_frames(path):
+    video = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = video.read()
+        if not ok:
+            return np.array(frames)
+        frames.append(frame)
+
+
+def test_segment_encoder(tmpdir):
+    for tt in range(10):
+        picture = np.full((30, 40, 3), tt * 20, dtype=np.uint8)
+        Image.fromarray(picture).save(tmpdir.join("frame_%05d.png" % tt).strpath)
+    mpath = tmpdir.join("movie.mp4").strpath
+    encoder = _SegmentEncoder(
+        mpath,
+        10,
+        3,
+        lambda frames, segment: _combine_ffmpeg_command(
+            tmpdir.strpath, os.path.basename(segment), 5, "frame_%05d.png", "-c:v libx264", frames
+        ),
+    )
+    assert [frames for frames, _ in encoder.segments] == [range(0, 4), range(4, 7), range(7, 10)]
+    # a segment is started once all of its frames are saved
+    encoder.done([0, 1, 2, 4, 5])
+    assert not encoder._processes
+    encoder.done([3, 6])
+    assert sorted(encoder._processes) == [0, 1]
+    encoder.close()
+    assert len(_video_frames(mpath)) == 10
+    # only the movie and the frames are left
+    assert len(tmpdir.listdir()) == 11
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(intermediate="store"),
+        dict(executor="processes", max_workers=2),
+        dict(parallel=True),
+    ],
+)
+@pytest.mark.parametrize("segments", [2, 7])
+def test_movie_save_segments(tmpdir, kwargs, segments):
+    da = xr.DataArray(np.random.rand(4, 5, 6), dims=["x", "y", "time"]).chunk({"time": 2})
+    mov = Movie(da, pixelwidth=400, pixelheight=300)
+    # lossless, so the frames do not depend on the segments
+    ffmpeg_options = "-c:v libx264 -crf 0 -pix_fmt yuv444p"
+    mov.save(tmpdir.join("expected.mp4").strpath, ffmpeg_options=ffmpeg_options)
+    mov.save(
+        tmpdir.join("movie.mp4").strpath, ffmpeg_options=ffmpeg_options, segments=segments, **kwargs
+    )
+    np.testing.assert_array_equal(
+        _video_frames(tmpdir.join("movie.mp4").strpath),
+        _video_frames(tmpdir.join("expected.mp4").strpath),
+    )
+    assert sorted(f.basename for f in tmpdir.listdir()) == ["expected.mp4", "movie.mp4"]
+
+
+def test_movie_save_segments_stream(tmpdir):
+    mov = Movie(test_dataarray())
+    with pytest.raises(ValueError, match="segments"):
+        mov.save(tmpdir.join("movie.mp4").strpath, intermediate="stream", segments=2)
 
 
 def test_plotfunc_kwargs(tmpdir):
@@ -6,12 +6,27 @@ import pytest
 import xarray as xr
 
 from xmovie.presets import (
+    _cell_index,
     _check_input,
     _core_plot,
+    _globe_path,
+    _globe_projection,
+    _globe_view,
+    _gridline_segments,
+    _regrid_index,
     _smooth_boundary_NearsidePerspective,
+    basic,
+    raster,
+    rotating_globe,
+    rotating_globe_dark,
 )
 
 
+def _render(fig):
+    fig.canvas.draw()
+    return np.array(fig.canvas.buffer_rgba())
+
+
 def test_check_input():
     # this should be done with a more sophisticated example
     ds = xr.Dataset(
@@ -58,3 +73,189 @@ def test_smooth_boundary_NearsidePerspective(lon, lat, sat_height):
 
     assert pr.proj4_params == pr_mod.proj4_params
     assert pr.globe == pr_mod.globe
+
+
+def test_globe_projection():
+    proj = _globe_projection(-110.0, 25.0)
+    # the same view shares the projection (and everything cartopy caches for it)
+    assert _globe_projection(-110.0, 25.0) is proj
+    assert proj == ccrs.NearsidePerspective(central_longitude=-110, central_latitude=25)
+    assert _globe_projection(-100.0, 25.0) is not proj
+
+
+def test_globe_view():
+    assert _globe_view(190, 25) == (-170.0, 25.0)
+    assert _globe_view(-110.0000000001, 25) == (-110.0, 25.0)
+    # every rotation of a looping movie shows the same views, and shares their projections
+    lon, lat = _globe_path(31, -100, 3, 25, 0)
+    views = {_globe_view(lo, la) for lo, la in zip(lon, lat)}
+    assert len(views) == 10
+    _globe_projection.cache_clear()
+    for lo, la in zip(lon, lat):
+        _globe_projection(*_globe_view(lo, la))
+    assert _globe_projection.cache_info().misses == 10
+
+
+def test_gridline_segments():
+    proj = _globe_projection(-110.0, 25.0)
+    segments = _gridline_segments(proj)
+    assert _gridline_segments(proj) is segments
+    assert all(np.isfinite(segment).all() for segment in segments)
+    # the lines are on the visible side of the globe
+    fig, ax = plt.subplots(subplot_kw=dict(projection=proj))
+    ax.set_global()
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    points = np.concatenate(segments)
+    assert (points[:, 0] >= x0).all() and (points[:, 0] <= x1).all()
+    assert (points[:, 1] >= y0).all() and (points[:, 1] <= y1).all()
+    plt.close(fig)
+
+
+def test_cell_index():
+    centers = np.array([0.0, 10.0, 20.0])
+    values = np.array([-6, -4, 4, 6, 24, 26, np.nan])
+    np.testing.assert_array_equal(_cell_index(centers, values), [-1, 0, 0, 1, 2, -1, -1])
+    # unsorted centers index into the original order
+    np.testing.assert_array_equal(_cell_index(centers[::-1], values), [-1, 2, 2, 1, 0, -1, -1])
+    # periodic cells covering the full circle
+    lon = np.arange(-180, 180, 90.0)
+    np.testing.assert_array_equal(
+        _cell_index(lon, np.array([-180, 179, 181, 540, 44, 46]), period=360), [0, 0, 0, 0, 2, 3]
+    )
+
+
+def test_regrid_index():
+    proj = _globe_projection(-110.0, 25.0)
+    lon = tuple(np.arange(-180, 180, 20.0))
+    lat = tuple(np.arange(-90, 91, 20.0))
+    x, y, index = _regrid_index(proj, (50, 50), lon, lat)
+    assert _regrid_index(proj, (50, 50), lon, lat)[2] is index
+    assert x.shape == y.shape == (50,)
+    assert index.shape == (50, 50)
+    # only the corners are off the globe
+    assert index[0, 0] == index[-1, -1] == -1
+    assert index[25, 25] >= 0
+    assert index.max() < len(lon) * len(lat)
+
+
+def test_rotating_globe_regrid_contour():
+    da = xr.DataArray(
+        np.random.rand(4, 5, 2),
+        coords=[("lon", np.arange(4.0)), ("lat", np.arange(5.0)), ("time", np.arange(2))],
+    )
+    with pytest.raises(ValueError, match="regrid"):
+        rotating_globe(da, plt.figure(), 0, "time", plotmethod="contour", regrid=True, coastline=False)
+    plt.close("all")
+
+
+@pytest.mark.parametrize("fixed_limits", [True, False])
+@pytest.mark.parametrize(
+    "preset, kwargs",
+    [
+        (basic, dict()),
+        (basic, dict(plotmethod="imshow")),
+        (basic, dict(plotmethod="contourf")),
+        (basic, dict(plotmethod="contour")),
+        (basic, dict(x="lon", y="lat")),
+        (rotating_globe, dict(lon_rotations=0, coastline=False)),
+        (rotating_globe, dict(coastline=False)),
+        (rotating_globe, dict(coastline=False, gridlines=True)),
+        (rotating_globe, dict(coastline=False, regrid=True)),
+    ],
+)
+def test_preset_setup_update(preset, kwargs, fixed_limits):
+    # updating a figure has to give the same result as drawing each frame from scratch
+    lon = np.arange(-180, 180, 20)
+    lat = np.arange(-90, 91, 20)
+    da = xr.DataArray(
+        np.random.rand(len(lon), len(lat), 3) * np.array([1, 100, 1000]),
+        coords=[("lon", lon), ("lat", lat), ("time", np.arange(3))],
+    )
+    if fixed_limits:
+        kwargs = dict(kwargs, vmin=0, vmax=1, extend="neither")
+    fig = plt.figure()
+    state = preset.setup(fig, da, "time", **kwargs)
+    for tt in range(3):
+        ax, pp = preset.update(state, tt)
+        assert ax in fig.axes
+        updated = _render(fig)
+
+        fig_expected = plt.figure()
+        preset(da, fig_expected, tt, "time", **kwargs)
+        np.testing.assert_array_equal(updated, _render(fig_expected))
+        plt.close(fig_expected)
+    plt.close(fig)
+
+
+@pytest.mark.parametrize("kwargs", [dict(), dict(x="x", y="y"), dict(origin="lower", cmap="RdBu")])
+def test_raster_render(kwargs):
+    da = xr.DataArray(
+        np.random.rand(12, 8, 5),
+        coords=[("y", np.arange(12)), ("x", np.arange(8)), ("time", np.arange(5))],
+    )
+    # bad values, under and over the color limits
+    da[2:4, 1:3] = np.nan
+    da[5] = 1.5
+    da[6] = -1
+    kwargs = dict(kwargs, vmin=0.1, vmax=0.9, extend="both", batch_size=2)
+    fig = plt.figure(figsize=(6.4, 3.6), dpi=100)
+    state = raster.setup(fig, da, "time", **kwargs)
+    pictures = list(raster.render(state, range(5)))
+    assert [tt for tt, _ in pictures] == list(range(5))
+    for tt, picture in pictures:
+        assert picture.dtype == np.uint8
+        ax, pp = raster.update(state, tt)
+        expected = _render(fig)
+        assert picture.shape == expected.shape
+        # up to the antialiased edges of the image
+        assert (picture != expected).any(axis=-1).mean() < 0.01
+
+        fig_expected = plt.figure(figsize=(6.4, 3.6), dpi=100)
+        raster(da, fig_expected, tt, "time", **kwargs)
+        np.testing.assert_array_equal(expected, _render(fig_expected))
+        plt.close(fig_expected)
+    plt.close(fig)
+
+
+def test_raster_input():
+    da = xr.DataArray(np.random.rand(4, 5, 2, 3), dims=["x", "y", "z", "time"])
+    with pytest.raises(ValueError, match="2D"):
+        raster(da, plt.figure(), 0, "time")
+    plt.close("all")
+
+
+@pytest.mark.parametrize(
+    "preset, kwargs", [(basic, dict()), (rotating_globe, dict(lon_rotations=0, coastline=False))]
+)
+def test_preset_blit(preset, kwargs):
+    da = xr.DataArray(
+        np.random.rand(4, 5, 3),
+        coords=[("lon", np.arange(4.0)), ("lat", np.arange(5.0)), ("time", range(3))],
+    )
+    kwargs = dict(kwargs, vmin=0, vmax=1, extend="neither")
+    fig = plt.figure()
+    state = preset.setup(fig, da, "time", blit=True, **kwargs)
+    ax, pp = preset.update(state, 0)
+    # the first frame is drawn completely
+    assert not pp.get_animated()
+    for tt in range(1, 3):
+        ax, pp = preset.update(state, tt)
+        assert pp.get_animated() and ax.title.get_animated()
+    plt.close(fig)
+
+    # artists are only animated when blitting
+    fig = plt.figure()
+    state = preset.setup(fig, da, "time", **kwargs)
+    for tt in range(3):
+        ax, pp = preset.update(state, tt)
+    assert not pp.get_animated()
+    plt.close(fig)
+
+
+def test_rotating_globe_dark_setup_update():
+    da = xr.DataArray(np.random.rand(4, 5, 2), dims=["x", "y", "time"])
+    with pytest.warns(DeprecationWarning):
+        state = rotating_globe_dark.setup(plt.figure(), da, "time")
+    assert state["style"] == "dark"
+    assert rotating_globe_dark.update is rotating_globe.update